@@ -2,7 +2,7 @@
 #
 __author__ = 'J. B. Otterson'
 __copyright__ = 'Copyright 2024, 2025 J. B. Otterson N1KDO.'
-__version__ = '0.1.3'  # 2026-04-28
+__version__ = '0.1.7'  # 2026-10-19
 #
 # bastardized from Peter Hinch's alcd.py retrieved from
 #  https://github.com/peterhinch/micropython-async/blob/master/v3/as_drivers/hd44780/alcd.py
@@ -24,21 +24,28 @@ __version__ = '0.1.3'  # 2026-04-28
 # Author : Matt Hawkins
 # Site   : http://www.raspberrypi-spy.co.uk
 
-from utils import upython
+from utils import upython, microseconds, sleep_ms as asleep_ms
 
 import asyncio
 
-# noinspection PyUnresolvedReferences
-from time import (sleep_ms, sleep_us)
-
 if upython:
+    # noinspection PyUnresolvedReferences
+    from time import sleep_us
     # noinspection PyUnresolvedReferences
     from machine import Pin
     import micropython
 else:
+    from time import sleep
+    from not_machine import machine
+    from utils import micropython
+    Pin = machine.Pin
+
     def const(i):  # support micropython const() in cpython
         return i
 
+    def sleep_us(us):
+        sleep(us / 1000000)
+
 
 # ********************************** GLOBAL CONSTANTS: TARGET BOARD PIN NUMBERS *************************************
 
@@ -63,75 +70,205 @@ PINLIST = ("Y1", "Y2", "Y6", "Y5", "Y4", "Y3")  # As used in testing.
 # Assigning changed data to the LCD object sets a "dirty" flag for that line. The LCD's runlcd thread then updates the
 # hardware and clears the flag
 
-# lcd_byte and lcd_nybble method use explicit delays. This is because execution
-# time is short relative to general latency (on the order of 300μs).
+# N1KDO: the lines are kept in a frame buffer, one bytearray per row, and a shadow copy of what the panel shows.
+# assigning a line copies it into the frame buffer, and update_lcd only writes the runs of characters that differ
+# from the shadow, setting the DDRAM address at the start of each run.
 
+# N1KDO: update_lcd does not drive the pins.  it puts the bytes to send in a command buffer, two bytes per entry,
+# the RS value and the byte, and hands the buffer to a transport.  GpioTransport bit-bangs the pins, yielding to
+# the other tasks after each batch of bytes; the 5 ms initialisation delays are awaited rather than slept.
+# RecordingTransport keeps what would be sent, with timestamps, and a model of the display RAM, for testing on
+# CPython.
 
-class LCD:  # LCD objects appear as read/write lists
-    __slots__ = ('_LCD_E', '_LCD_RS', '_datapins', '_cols', '_rows', '_lines', '_dirty', '_initialising')
+_RS_CMD = const(0)
+_RS_CHR = const(1)
 
-    INITSTRING = b"\x33\x32\x28\x0C\x06\x01"
-    LCD_LINES = (0x80, 0xC0)  # LCD RAM address for the 1st and 2nd line (0 and 40H)
-    CHR = True
-    CMD = False
-    E_PULSE = const(50)  # Timing constants in uS
-    E_DELAY = const(50)
 
-    def __init__(self, pinlist, cols, rows=2):  # Init with pin nos for enable, rs, D4, D5, D6, D7
-        self._initialising = True
+class GpioTransport:
+    """
+    sends LCD command buffers over the 4 bit parallel interface.  the only busy waits are the enable pulse
+    and the controller's execution time after each byte, about 50 us per byte.
+    """
+    __slots__ = ('_LCD_E', '_LCD_RS', '_datapins', '_batch')
+    E_PULSE = const(1)  # Timing constants in uS.  enable pulse must be > 450 ns
+    E_DELAY = const(50)  # most instructions take 37 uS to execute
+    E_INIT_DELAY = const(100)  # gap after each nybble of the initialisation, while the interface width is unknown
+
+    def __init__(self, pinlist, batch=20):  # Init with pin nos for rs, enable, D4, D5, D6, D7
+        """
+        :param batch: the most bytes to send before yielding to other tasks.  a batch of 20 takes about 1 ms.
+        """
         self._LCD_E = Pin(pinlist[1], Pin.OUT)  # Create and initialise the hardware pins
         self._LCD_RS = Pin(pinlist[0], Pin.OUT)
         self._datapins = [Pin(pin_name, Pin.OUT) for pin_name in pinlist[2:]]
-        self._cols = cols
-        self._rows = rows
-        self._lines = [""] * self._rows
-        self._dirty = [False] * self._rows
-        for b in LCD.INITSTRING:
-            self.lcd_byte(b, LCD.CMD)
-            self._initialising = False  # Long delay after first byte only
-        asyncio.create_task(self.update_lcd())
+        self._batch = batch
 
     @micropython.native
-    def lcd_nybble(self, bits):  # send the LS 4 bits
+    def _nybble(self, bits):  # send the LS 4 bits
         for pin in self._datapins:
             pin.value(bits & 0x01)
             bits >>= 1
-        sleep_us(LCD.E_DELAY)  # 50μs
         self._LCD_E.value(True)  # Toggle the enable pin
-        sleep_us(LCD.E_PULSE)
+        sleep_us(GpioTransport.E_PULSE)
         self._LCD_E.value(False)
-        if self._initialising:
-            sleep_ms(5)
-        else:
-            sleep_us(LCD.E_DELAY)  # 50μs
 
     @micropython.native
-    def lcd_byte(self, bits, mode):  # Send byte to data pins: bits = data
-        self._LCD_RS.value(mode)  # mode = True  for character, False for command
-        self.lcd_nybble(bits >> 4)  # send high bits
-        self.lcd_nybble(bits)  # then low ones
+    def _byte(self, bits, mode):  # Send byte to data pins: bits = data
+        self._LCD_RS.value(mode)  # mode = 1 for character, 0 for command
+        self._nybble(bits >> 4)  # send high bits
+        self._nybble(bits)  # then low ones
+        sleep_us(GpioTransport.E_DELAY)
+
+    async def init(self, initstring):
+        self._LCD_RS.value(_RS_CMD)
+        first = True
+        for b in initstring:
+            self._nybble(b >> 4)
+            sleep_us(GpioTransport.E_INIT_DELAY)
+            if first:  # the datasheet wants > 4.1 ms after the first 3
+                await asleep_ms(5)
+                first = False
+            self._nybble(b)
+            await asleep_ms(5)  # clear display needs 1.52 ms, the rest are not in a hurry either.
 
     @micropython.native
-    def __setitem__(self, line, message):  # Send string to display line 0 or 1
-        message = "{0:{1}.{1}}".format(message, self._cols)
-        if message != self._lines[line]:  # Only update LCD if data has changed
-            self._lines[line] = message  # Update stored line
-            self._dirty[line] = True  # Flag its non-correspondence with the LCD device
+    async def write(self, buf, n):
+        """
+        send the first n bytes of buf, (RS, byte) pairs.
+        """
+        batch = self._batch
+        sent = 0
+        for i in range(0, n, 2):
+            self._byte(buf[i + 1], buf[i])
+            sent += 1
+            if sent >= batch:
+                sent = 0
+                await asleep_ms(0)
+
+
+class RecordingTransport:
+    """
+    keeps what would be sent to the LCD, with the time each batch was sent, and a model of the display RAM,
+    so that LCD output and timing can be checked without a display.
+    """
+    __slots__ = ('records', 'writes', '_ddram', '_address', '_cols', '_rows')
+
+    def __init__(self, cols=20, rows=2):
+        self.records = []  # (microseconds, RS, byte)
+        self.writes = 0  # number of write() calls, not counting init
+        self._ddram = bytearray(b' ' * 0x80)
+        self._address = 0
+        self._cols = cols
+        self._rows = rows
+
+    def _byte(self, bits, mode, now):
+        self.records.append((now, mode, bits))
+        if mode == _RS_CHR:
+            self._ddram[self._address] = bits
+            self._address = (self._address + 1) & 0x7f
+        elif bits & 0x80:  # set DDRAM address
+            self._address = bits & 0x7f
+        elif bits == 0x01:  # clear display
+            self._ddram[:] = b' ' * 0x80
+            self._address = 0
+
+    async def init(self, initstring):
+        for b in initstring:
+            self._byte(b, _RS_CMD, microseconds())
+
+    async def write(self, buf, n):
+        now = microseconds()
+        self.writes += 1
+        for i in range(0, n, 2):
+            self._byte(buf[i + 1], buf[i], now)
+
+    def lines(self):
+        """
+        :return: the text the display would show, one string per row.
+        """
+        return [self._ddram[LCD.LCD_LINES[row] - 0x80:LCD.LCD_LINES[row] - 0x80 + self._cols].decode()
+                for row in range(self._rows)]
+
+    def clear_records(self):
+        del self.records[:]
+        self.writes = 0
+
+
+class LCD:  # LCD objects appear as read/write lists
+    __slots__ = ('_transport', '_cols', '_rows', '_frame', '_shown', '_dirty', '_cmd', 'bytes_written')
+
+    INITSTRING = b"\x33\x32\x28\x0C\x06\x01"
+    LCD_LINES = (0x80, 0xC0)  # LCD RAM address for the 1st and 2nd line (0 and 40H)
+    CHR = _RS_CHR
+    CMD = _RS_CMD
+
+    def __init__(self, pinlist, cols, rows=2, transport=None):  # Init with pin nos for rs, enable, D4, D5, D6, D7
+        """
+        :param pinlist: pin numbers for rs, enable, D4, D5, D6 and D7, used to make a GpioTransport.
+        :param transport: send the LCD bytes with this instead, for example a RecordingTransport.
+        """
+        self._transport = transport if transport is not None else GpioTransport(pinlist)
+        self._cols = cols
+        self._rows = rows
+        self._frame = [bytearray(b' ' * cols) for _ in range(rows)]  # what should be shown
+        self._shown = [bytearray(b' ' * cols) for _ in range(rows)]  # what the panel shows, blank after clear
+        self._dirty = False
+        self._cmd = bytearray(2 * rows * 2 * cols)  # worst case, an address command for every other character
+        self.bytes_written = 0  # command and character bytes sent to the panel, for measuring
+        asyncio.create_task(self.update_lcd())
+
+    @micropython.native
+    def __setitem__(self, line, message):  # Send string or bytes to display line 0 or 1
+        if isinstance(message, str):
+            message = message.encode()
+        row = self._frame[line]
+        cols = self._cols
+        n = len(message)
+        if n > cols:
+            n = cols
+        row[:n] = message[:n] if n < len(message) else message  # truncated or padded to the display width
+        for i in range(n, cols):
+            row[i] = 0x20
+        self._dirty = True
 
     def __getitem__(self, line):
-        return self._lines[line]
+        return self._frame[line].decode()
 
     @micropython.native
+    def _fill_commands(self):
+        # put the commands for the runs of changed characters in _cmd, mark them shown.  return the length used.
+        cols = self._cols
+        cmd = self._cmd
+        n = 0
+        for row in range(self._rows):
+            frame = self._frame[row]
+            shown = self._shown[row]
+            col = 0
+            while col < cols:
+                if frame[col] == shown[col]:
+                    col += 1
+                    continue
+                cmd[n] = _RS_CMD
+                cmd[n + 1] = LCD.LCD_LINES[row] + col  # set DDRAM address to the run start
+                n += 2
+                while col < cols and frame[col] != shown[col]:
+                    c = frame[col]
+                    cmd[n] = _RS_CHR
+                    cmd[n + 1] = c
+                    n += 2
+                    shown[col] = c
+                    col += 1
+        return n
+
     async def update_lcd(self):
-        asleep_ms = asyncio.sleep_ms
-        # Periodically check for changed text and update LCD if so
+        # Periodically check for changed text and send the runs of changed characters to the LCD
+        transport = self._transport
+        await transport.init(LCD.INITSTRING)
         while True:
-            for row in range(self._rows):
-                if self._dirty[row]:
-                    msg = self[row]
-                    self._dirty[row] = False
-                    self.lcd_byte(LCD.LCD_LINES[row], LCD.CMD)
-                    for thisbyte in msg:
-                        self.lcd_byte(ord(thisbyte), LCD.CHR)
-                        await asleep_ms(0)  # Reschedule ASAP
+            if self._dirty:
+                self._dirty = False
+                n = self._fill_commands()
+                if n:
+                    self.bytes_written += n // 2
+                    await transport.write(self._cmd, n)
             await asleep_ms(20)  # Give other coros a look-in
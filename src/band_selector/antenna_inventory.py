@@ -0,0 +1,150 @@
+#
+# antenna_inventory.py -- antenna switch inventory, as reported by the switch status datagrams.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+from array import array
+from struct import unpack
+
+from udp_messages import (STATUS_BROADCAST_FMT, STATUS_BROADCAST_SIZE, SWITCH_NAME_POS, SWITCH_NAME_SIZE,
+                          RADIO_1_ANTENNA_OFFSET, RADIO_2_ANTENNA_OFFSET, RADIO_NAMES_OFFSET, RADIO_NAMES_SIZE,
+                          ANTENNA_NAMES_OFFSET, ANTENNA_NAMES_SIZE, ANTENNA_BANDS_OFFSET, ANTENNA_BANDS_SIZE)
+from utils import milliseconds, num_bits_set
+
+# band number to band mask, band numbers are indexes into main.BANDS
+MASKS = (0x0000, 0x0001, 0x0002, 0x0004, 0x0008, 0x0010, 0x0020, 0x0040, 0x0080, 0x0100, 0x0200, 0x0400, 0x800, 0x1000,
+         0x0000, 0x0000)
+
+
+def _decode(field: bytes) -> str:
+    return field.partition(b'\0')[0].decode()
+
+
+class AntennaInventory:
+    """
+    the antenna switch's radio names, antenna names and antenna band masks, plus the antenna selected for
+    each radio.  this is updated in place from received status datagrams.  generation is incremented
+    whenever the names or band masks change, so consumers can cache anything derived from them, like the
+    band to candidate antennas index.
+    """
+    __slots__ = ('radio_1_antenna', 'radio_2_antenna', 'radio_names', 'antenna_names', 'antenna_bands',
+                 'switch_name', 'generation', 'updated_ms', '_raw', '_name_field', '_band_index',
+                 '_index_generation')
+
+    def __init__(self, switch_name: str = ''):
+        self.radio_1_antenna = 0
+        self.radio_2_antenna = 0
+        self.radio_names = ('',) * RADIO_NAMES_SIZE
+        self.antenna_names = ()  # empty until the first datagram is received.
+        self.antenna_bands = array('H', [0] * ANTENNA_BANDS_SIZE)
+        self.generation = 0
+        self.updated_ms = 0
+        self._raw = bytearray(STATUS_BROADCAST_SIZE)  # copy of the last datagram accepted
+        self.switch_name = ''
+        self._name_field = b''
+        self._band_index = ((),) * len(MASKS)
+        self._index_generation = -1
+        self.set_switch_name(switch_name)
+
+    def set_switch_name(self, switch_name: str) -> None:
+        """
+        set the name of the switch whose datagrams are accepted.
+        """
+        field = bytearray(SWITCH_NAME_SIZE)
+        name = switch_name.encode()[:SWITCH_NAME_SIZE]
+        field[:len(name)] = name
+        self.switch_name = switch_name
+        self._name_field = bytes(field)
+        self._raw[:] = bytes(STATUS_BROADCAST_SIZE)  # forget the last datagram
+
+    def is_from_switch(self, buf) -> bool:
+        return buf[SWITCH_NAME_POS:] == self._name_field
+
+    def update_from_buffer(self, buf) -> bool:
+        """
+        update the inventory from a raw status datagram.
+        the usual case, a datagram identical to the last one, does not allocate.
+        :param buf: the received datagram, STATUS_BROADCAST_SIZE bytes.
+        :return: True if the datagram is from our switch, False if it was ignored.
+        """
+        if buf == self._raw:
+            self.updated_ms = milliseconds()
+            return True
+        if not self.is_from_switch(buf):
+            return False
+        fields = unpack(STATUS_BROADCAST_FMT, buf)
+        self.radio_1_antenna = fields[RADIO_1_ANTENNA_OFFSET]
+        self.radio_2_antenna = fields[RADIO_2_ANTENNA_OFFSET]
+        changed = False
+        radio_names = tuple(_decode(fields[RADIO_NAMES_OFFSET + i]) for i in range(RADIO_NAMES_SIZE))
+        if radio_names != self.radio_names:
+            self.radio_names = radio_names
+            changed = True
+        antenna_names = tuple(_decode(fields[ANTENNA_NAMES_OFFSET + i]) for i in range(ANTENNA_NAMES_SIZE))
+        if antenna_names != self.antenna_names:
+            self.antenna_names = antenna_names
+            changed = True
+        antenna_bands = self.antenna_bands
+        for i in range(ANTENNA_BANDS_SIZE):
+            mask = fields[ANTENNA_BANDS_OFFSET + i] & 0xffff
+            if antenna_bands[i] != mask:
+                antenna_bands[i] = mask
+                changed = True
+        if changed:
+            self.generation += 1
+        self._raw[:] = buf
+        self.updated_ms = milliseconds()
+        return True
+
+    def raw_datagram(self):
+        """
+        :return: the last datagram accepted.  this is the inventory's own buffer, do not change it.
+        """
+        return self._raw
+
+    def band_candidates(self, band_number: int) -> tuple:
+        """
+        get the antennas that work on a band.
+        :param band_number: the band number, 0-15.
+        :return: tuple of antenna indexes (0-7), antennas that work on the fewest other bands first.
+        """
+        if self._index_generation != self.generation:
+            self._build_band_index()
+        return self._band_index[band_number]
+
+    def _build_band_index(self) -> None:
+        antenna_bands = self.antenna_bands
+        ranked = sorted(range(len(antenna_bands)), key=lambda i: (num_bits_set(antenna_bands[i]), i))
+        self._band_index = tuple(tuple(i for i in ranked if mask & antenna_bands[i]) for mask in MASKS)
+        self._index_generation = self.generation
+
+    def as_dict(self) -> dict:
+        return {'switch_name': self.switch_name,
+                'generation': self.generation,
+                'radio_1_antenna': self.radio_1_antenna,
+                'radio_2_antenna': self.radio_2_antenna,
+                'radio_names': list(self.radio_names),
+                'antenna_names': list(self.antenna_names),
+                'antenna_bands': list(self.antenna_bands),
+                }
@@ -0,0 +1,132 @@
+#
+# band_trace.py -- per-stage timing of band changes, from band detection to TX inhibit release.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+
+from array import array
+
+from utils import milliseconds, ticks_diff, upython
+
+if not upython:
+    def const(i):
+        return i
+
+# trace stages, in the order they normally happen.  DETECTED is the start time of the trace.
+DETECTED = const(0)  # band data changed, inhibit asserted
+SETTLED = const(1)  # new band data steady long enough to be accepted
+DISPATCHED = const(2)  # band change message handled by msg_loop
+REQUESTED = const(3)  # first select antenna api request sent
+RESPONDED = const(4)  # first select antenna api response handled
+CONFIRMED = const(5)  # status broadcast showed the requested antenna
+RELEASED = const(6)  # TX inhibit released
+STAGE_NAMES = ('detected', 'settled', 'dispatched', 'requested', 'responded', 'confirmed', 'released')
+
+# fields of one trace record
+_ID = const(0)
+_BAND = const(1)
+_START_MS = const(2)
+_REQUESTS = const(3)
+_STAGES = const(4)  # first stage field, DETECTED.  each stage is ms since DETECTED, or -1 if not reached yet.
+_FIELDS = const(11)
+
+
+class BandTraces:
+    """
+    a fixed ring of recent band change traces.  a trace is started when the band data changes, and the
+    trace id is carried in the messages that follow, so each stage can be timestamped.  does not allocate
+    except in as_list().
+    """
+    __slots__ = ('_traces', '_size', '_next_id')
+
+    def __init__(self, size=16):
+        self._traces = array('l', [0] * (size * _FIELDS))
+        self._size = size
+        self._next_id = 1
+
+    def start(self, band: int) -> int:
+        """
+        start a new trace, overwriting the oldest one.
+        :param band: the band data (not the band number) first read, which may not be the settled value.
+        :return: the trace id.
+        """
+        trace_id = self._next_id
+        self._next_id = trace_id + 1
+        traces = self._traces
+        base = (trace_id % self._size) * _FIELDS
+        traces[base + _ID] = trace_id
+        traces[base + _BAND] = band
+        traces[base + _START_MS] = milliseconds()
+        traces[base + _REQUESTS] = 0
+        traces[base + _STAGES + DETECTED] = 0
+        for stage in range(SETTLED, RELEASED + 1):
+            traces[base + _STAGES + stage] = -1
+        return trace_id
+
+    def settle(self, trace_id: int, band: int) -> None:
+        """
+        record the settled band data, and the time it was accepted.
+        """
+        if trace_id <= 0:
+            return
+        base = (trace_id % self._size) * _FIELDS
+        if self._traces[base + _ID] == trace_id:
+            self._traces[base + _BAND] = band
+            self.mark(trace_id, SETTLED)
+
+    def mark(self, trace_id: int, stage: int) -> None:
+        """
+        record the time a stage was reached.  only the first time is recorded.
+        ignored if the trace id is 0 (no trace) or the trace has been overwritten.
+        """
+        if trace_id <= 0:
+            return
+        traces = self._traces
+        base = (trace_id % self._size) * _FIELDS
+        if traces[base + _ID] != trace_id:
+            return
+        if stage == REQUESTED:
+            traces[base + _REQUESTS] += 1
+        if traces[base + _STAGES + stage] < 0:
+            traces[base + _STAGES + stage] = ticks_diff(milliseconds(), traces[base + _START_MS])
+
+    def as_list(self) -> list:
+        """
+        :return: list of traces as dicts, most recent first.
+        """
+        traces = self._traces
+        result = []
+        last_id = self._next_id - 1
+        for trace_id in range(last_id, max(0, last_id - self._size), -1):
+            base = (trace_id % self._size) * _FIELDS
+            stages = {}
+            for stage in range(DETECTED, RELEASED + 1):
+                t = traces[base + _STAGES + stage]
+                stages[STAGE_NAMES[stage]] = t if t >= 0 else None
+            result.append({'id': trace_id,
+                           'band_data': traces[base + _BAND],
+                           'requests': traces[base + _REQUESTS],
+                           'stages_ms': stages,
+                           })
+        return result
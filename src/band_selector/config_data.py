@@ -4,7 +4,7 @@
 
 __author__ = 'J. B. Otterson'
 __copyright__ = 'Copyright 2026 J. B. Otterson N1KDO.'
-__version__ = '0.0.1'  # 2026-01-01
+__version__ = '0.0.4'  # 2026-10-19
 
 #
 # Copyright 2026 J. B. Otterson N1KDO.
@@ -42,11 +42,15 @@ class ConfigData(CachedConfigData):
         return {
             'ap_mode': False,
             'auto_on': False,
+            'band_antenna_prefs': [0] * 16,  # per band number, the last antenna (1-8) selected, 0 for none.
+            'band_settle_ms': 10,  # new band data must be steady this long...
+            'band_settle_samples': 3,  # ...and for this many reads in a row before it is accepted.
             'dhcp': True,
             'dns_server': '8.8.8.8',
             'gateway': '192.168.1.1',
             'hostname': 'selector1',
             'ip_address': '192.168.1.73',
+            'log_console': True,  # print log entries on the USB console, as well as keeping them in RAM.
             'log_level': 'debug',
             'netmask': '255.255.255.0',
             'radio_number': 1,
@@ -54,5 +58,6 @@ class ConfigData(CachedConfigData):
             'secret': 'your_network_password',
             'switch_ip': '192.168.1.166',
             'switch_name': 'ant-switch',
+            'udp_multicast_group': '',
             'web_port': 80,
         }
@@ -0,0 +1,103 @@
+#
+# display.py -- the pages of text shown on the LCD, and a rate-limited painter.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+import asyncio
+
+from utils import sleep_ms
+
+
+class Display:
+    """
+    owns the pages of text for the LCD, and which page is shown.  changing the page shown, or a line on it,
+    only marks the display changed; the painter task writes the latest text of the shown page to the LCD,
+    at most once every refresh_ms.  changes made in between are never painted.
+    """
+    __slots__ = ('_lcd', '_pages', '_cols', '_refresh_ms', '_on_paint', '_changed', 'page', 'updates', 'paints')
+
+    def __init__(self, lcd, num_pages, cols=20, refresh_ms=100, on_paint=None):
+        """
+        :param lcd: the LCD to paint.
+        :param num_pages: the number of pages of 2 lines.
+        :param refresh_ms: the shortest time between paints.
+        :param on_paint: optional function called with the two lines painted, centered and cut to cols.
+        """
+        self._lcd = lcd
+        self._pages = [['', ''] for _ in range(num_pages)]
+        self._cols = cols
+        self._refresh_ms = refresh_ms
+        self._on_paint = on_paint
+        self._changed = asyncio.Event()
+        self.page = 0  # the page shown
+        self.updates = 0  # changes to the page shown
+        self.paints = 0  # times the LCD was written
+        asyncio.create_task(self._painter())
+
+    def lines(self, page: int) -> list:
+        return self._pages[page]
+
+    def update_page(self, page: int, line1=None, line2=None) -> None:
+        """
+        change lines on a page.  a line that is None is left unchanged.  the display is repainted if the
+        page is the one shown.
+        """
+        if 0 <= page < len(self._pages):
+            lines = self._pages[page]
+            updated = False
+            if line1 is not None and lines[0] != line1:
+                lines[0] = line1
+                updated = True
+            if line2 is not None and lines[1] != line2:
+                lines[1] = line2
+                updated = True
+            if updated:
+                self.show_page(page)
+
+    def show_page(self, page: int) -> None:
+        if 0 <= page < len(self._pages):
+            self.page = page
+            self.updates += 1
+            self._changed.set()
+
+    async def _painter(self):
+        lcd = self._lcd
+        cols = self._cols
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            lines = self._pages[self.page]
+            line0 = '{:^{}.{}s}'.format(lines[0], cols, cols)  # centered, and cut to the width of the panel
+            line1 = '{:^{}.{}s}'.format(lines[1], cols, cols)
+            lcd[0] = line0
+            lcd[1] = line1
+            self.paints += 1
+            if self._on_paint is not None:
+                self._on_paint(line0, line1)
+            await sleep_ms(self._refresh_ms)
+
+    def stats(self) -> dict:
+        return {'updates': self.updates,
+                'paints': self.paints,
+                }
@@ -0,0 +1,285 @@
+#
+# input_scanner.py -- one task that samples and debounces all the GPIO inputs.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.5'  # 2026-10-19
+
+from array import array
+from asyncio import create_task
+import sys
+
+from utils import micropython, milliseconds, sleep_ms, ticks_diff, upython, ThreadSafeFlag
+
+if upython:
+    from machine import Pin
+    if sys.platform == 'rp2':
+        from machine import mem32
+    else:
+        mem32 = None
+else:
+    from not_machine import machine
+    Pin = machine.Pin
+    mem32 = None
+
+    def const(i):
+        return i
+
+_SIO_GPIO_IN = const(0xd0000004)  # RP2040 SIO GPIO_IN register, the level of every GPIO pin in one word
+_SETTLE_SAMPLE_MS = const(2)  # time between samples of an input that needs more samples to settle
+
+# input kinds
+_PIN = const(0)  # sends low_msg or hi_msg when the pin changes
+_BUTTON = const(1)  # sends short_msg or long_msg when the button is released
+_BITS = const(2)  # sends (msg_type, value) when the value of a group of pins changes
+
+
+class InputScanner:
+    """
+    samples every input in one pass, from one read of the GPIO port when it can, so all the inputs share a
+    sampling time.  an input's value is accepted once it has been steady for that input's debounce time and
+    for its number of samples.  a value that changes before it is accepted is counted as a transient.
+    a group of pins can also report the first sample of a change, before it has settled.
+    the messages for all the inputs that changed are put on the queue together after the pass.
+    with use_irq, the scanner sleeps until a pin change interrupt while all the inputs are steady,
+    otherwise it polls every scan_ms.
+    """
+    __slots__ = ('_queue', '_scan_ms', '_flag', '_port_read', '_pins', '_inputs', '_kinds', '_debounce_ms',
+                 '_samples', '_stable', '_candidate', '_since', '_count', '_transients', '_pressed', '_msgs',
+                 '_events', 'scans', 'events', 'last_scan_ms')
+
+    def __init__(self, queue, scan_ms=50, use_irq=False, port_read=True):
+        """
+        :param queue: the message queue to write events to
+        :param scan_ms: the polling period, when not waiting for interrupts.
+        :param use_irq: if True, wait for a pin change interrupt when all the inputs are steady.
+        :param port_read: if True, read all the pins at once from the GPIO_IN register when running on a RP2040,
+                          otherwise read each pin.
+        """
+        self._queue = queue
+        self._scan_ms = scan_ms
+        self._flag = ThreadSafeFlag() if use_irq else None
+        self._port_read = port_read and mem32 is not None
+        self._pins = []  # (gpio number, Pin) for each pin, for reading the pins one at a time
+        self._inputs = []  # tuple of gpio numbers for each input, MSB first
+        self._kinds = bytearray()
+        self._debounce_ms = array('H')
+        self._samples = bytearray()  # number of samples a candidate value must be seen in a row
+        self._stable = array('b')  # accepted value, -1 if none yet
+        self._candidate = array('b')  # value being debounced, -1 if none
+        self._since = array('l')  # time the candidate value was first seen
+        self._count = bytearray()  # number of samples in a row the candidate value has been seen
+        self._transients = array('L')  # candidate values that changed before they were accepted
+        self._pressed = array('l')  # for buttons, time the button was pressed
+        self._msgs = []  # (low_msg, hi_msg), (short_msg, long_msg, long_press_ms) or (base_msg, on_change, on_edge)
+        self._events = []  # messages from the last pass
+        self.scans = 0
+        self.events = 0
+        self.last_scan_ms = 0
+
+    def _add(self, gpios, kind, debounce_ms, samples, msgs) -> int:
+        for gpio in gpios:
+            pin = Pin(gpio, mode=Pin.IN, pull=Pin.PULL_UP)
+            self._pins.append((gpio, pin))
+            if self._flag is not None:
+                pin.irq(handler=self._irq_handler, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+        self._inputs.append(tuple(gpios))
+        self._kinds.append(kind)
+        self._debounce_ms.append(debounce_ms)
+        self._samples.append(samples)
+        self._stable.append(-1)
+        self._candidate.append(-1)
+        self._since.append(0)
+        self._count.append(0)
+        self._transients.append(0)
+        self._pressed.append(0)
+        self._msgs.append(msgs)
+        return len(self._kinds) - 1
+
+    def add_pin(self, gpio: int, low_msg, hi_msg, debounce_ms=50) -> int:
+        """
+        watch an input pin and send a message when it changes, and one with the pin's first value.
+        :return: the input number, for invalidate().
+        """
+        return self._add((gpio,), _PIN, debounce_ms, 1, (low_msg, hi_msg))
+
+    def add_button(self, gpio: int, short_press_message, long_press_message, debounce_ms=50,
+                   long_press_ms=500) -> int:
+        """
+        watch a push button, active low.  when it is released, send long_press_message if it was held for
+        long_press_ms or more, else short_press_message.
+        :return: the input number.
+        """
+        return self._add((gpio,), _BUTTON, debounce_ms, 1,
+                         (short_press_message, long_press_message, long_press_ms))
+
+    def add_bits(self, gpios, base_msg, on_change=None, debounce_ms=5, samples=1, on_edge=None) -> int:
+        """
+        read a group of pins as a number, for example band data from the Elecraft K3/K4 accessory jack.
+        the pins do not all change at the same instant, so a new value is only accepted after it has been
+        read unchanged for debounce_ms and in samples reads in a row.
+        :param gpios: the gpio numbers, [MSB...LSB]
+        :param base_msg: a tuple.  the message sent is (base_msg[0], value).
+        :param on_change: optional function called with the new value as soon as it is accepted, before the
+                          message is enqueued.  it must be quick and must not block.  if it returns a value
+                          other than None, that value is added to the message as a 3rd element.
+        :param on_edge: optional function called with the value read on the first sample that differs from
+                        the accepted value, before it has settled.  it must be quick and must not block.
+        :return: the input number.
+        """
+        return self._add(tuple(gpios), _BITS, debounce_ms, samples, (base_msg, on_change, on_edge))
+
+    def set_debounce(self, index: int, debounce_ms: int, samples: int = 1) -> None:
+        """
+        change how long an input must be steady before its value is accepted.
+        """
+        self._debounce_ms[index] = max(0, min(debounce_ms, 65535))
+        self._samples[index] = max(1, min(samples, 255))
+
+    def start(self) -> None:
+        create_task(self._scanner())
+
+    def invalidate(self, index: int) -> None:
+        """
+        forget the value of an input, so the next scan sends a message with its value.
+        """
+        self._stable[index] = -1
+        self._candidate[index] = -1
+        if self._flag is not None:
+            self._flag.set()
+
+    def _irq_handler(self, _):
+        self._flag.set()
+
+    @micropython.native
+    def _read(self) -> int:
+        if self._port_read:
+            return mem32[_SIO_GPIO_IN]
+        port = 0
+        for gpio, pin in self._pins:
+            port |= pin.value() << gpio
+        return port
+
+    @micropython.native
+    def _sample(self, port: int, now: int) -> int:
+        """
+        debounce all the inputs against one port sample.  messages for the inputs that changed are appended
+        to _events.
+        :return: the ms until the next candidate value can be accepted, or -1 if all the inputs are steady.
+        """
+        inputs = self._inputs
+        kinds = self._kinds
+        debounce = self._debounce_ms
+        samples = self._samples
+        stable = self._stable
+        candidate = self._candidate
+        since = self._since
+        count = self._count
+        transients = self._transients
+        events = self._events
+        wait = -1
+        for i in range(len(kinds)):
+            value = 0
+            for gpio in inputs[i]:
+                value = (value << 1) | ((port >> gpio) & 1)
+            if value == stable[i]:
+                if candidate[i] >= 0:  # went back before the candidate was accepted
+                    transients[i] += 1
+                    candidate[i] = -1
+                continue
+            if value != candidate[i]:
+                if candidate[i] >= 0:
+                    transients[i] += 1
+                elif kinds[i] == _BITS:  # first sample away from the accepted value
+                    self._edge(i, value)
+                candidate[i] = value
+                since[i] = now
+                count[i] = 1
+            elif count[i] < 255:
+                count[i] += 1
+            remaining = debounce[i] - ticks_diff(now, since[i])
+            if count[i] < samples[i] and remaining < _SETTLE_SAMPLE_MS:
+                remaining = _SETTLE_SAMPLE_MS
+            if remaining > 0:
+                if wait < 0 or remaining < wait:
+                    wait = remaining
+                continue
+            last = stable[i]
+            stable[i] = value
+            candidate[i] = -1
+            msg = self._accept(i, kinds[i], last, value)
+            if msg is not None:
+                events.append(msg)
+        return wait
+
+    def _edge(self, i, value):
+        on_edge = self._msgs[i][2]
+        if on_edge is not None:
+            on_edge(value)
+
+    def _accept(self, i, kind, last, value):
+        msgs = self._msgs[i]
+        if kind == _PIN:
+            return msgs[1] if value else msgs[0]
+        if kind == _BUTTON:
+            pressed = self._pressed
+            if value == 0:  # pressed, remember when.
+                pressed[i] = self._since[i]
+                return None
+            if last == -1:  # first value, no press to report.
+                return None
+            held_ms = ticks_diff(self._since[i], pressed[i])
+            return msgs[1] if held_ms >= msgs[2] else msgs[0]
+        base_msg, on_change, _ = msgs
+        extra = None if on_change is None else on_change(value)
+        return (base_msg[0], value) if extra is None else (base_msg[0], value, extra)
+
+    async def _scanner(self):
+        queue_put = self._queue.put
+        events = self._events
+        flag = self._flag
+        scan_ms = self._scan_ms
+        while True:
+            now = milliseconds()
+            self.last_scan_ms = now
+            self.scans += 1
+            wait = self._sample(self._read(), now)
+            if events:  # send them all together, after the pass
+                self.events += len(events)
+                for msg in events:
+                    await queue_put(msg)
+                del events[:]
+            if wait < 0:  # all steady
+                if flag is not None:
+                    await flag.wait()
+                    continue
+                wait = scan_ms
+            await sleep_ms(min(wait, scan_ms))
+
+    def stats(self) -> dict:
+        return {'scans': self.scans,
+                'events': self.events,
+                'inputs': len(self._kinds),
+                'transients': list(self._transients),
+                'port_read': self._port_read,
+                'irq': self._flag is not None,
+                }
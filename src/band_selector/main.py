@@ -4,7 +4,7 @@
 
 __author__ = 'J. B. Otterson'
 __copyright__ = 'Copyright 2022, 2026 J. B. Otterson N1KDO.'
-__version__ = '0.1.20'  # 2026-05-20
+__version__ = '0.1.47'  # 2026-10-19
 
 #
 # Copyright 2022, 2026 J. B. Otterson N1KDO.
@@ -35,26 +35,30 @@ import sys
 import time
 
 from alcd import LCD
-from button import Button
+from antenna_inventory import AntennaInventory, MASKS
+from band_trace import BandTraces, DISPATCHED, REQUESTED, RESPONDED, CONFIRMED, RELEASED
 from config_data import ConfigData
-from fourbits import FourBits
-from gpio_pin import GPIO_Pin
+from display import Display
+from histogram import Histogram
 from http_server import (HttpServer,
                          HTTP_STATUS_OK,
                          HTTP_STATUS_MOVED_PERMANENTLY,
                          HTTP_STATUS_BAD_REQUEST,
                          HTTP_VERB_GET,
                          HTTP_VERB_POST)
+from input_scanner import InputScanner
 
 import micro_logging as logging
+from message_dispatcher import MessageDispatcher
+from message_recorder import MessageRecorder
 from ntp import get_ntp_time
 from ringbuf_queue import RingbufQueue
+from selector_state import SelectorState
 import timer_manager
-from udp_messages import (calculate_broadcast_address, ReceiveBroadcasts, RADIO_1_ANTENNA_OFFSET,
-                          RADIO_2_ANTENNA_OFFSET, RADIO_NAMES_OFFSET, RADIO_NAMES_SIZE, ANTENNA_NAMES_OFFSET,
-                          ANTENNA_NAMES_SIZE, ANTENNA_BANDS_OFFSET, ANTENNA_BANDS_SIZE, SWITCH_NAME_OFFSET)
+from udp_messages import (calculate_broadcast_address, is_multicast_address, LinkStats, ReceiveBroadcasts,
+                          STATUS_BROADCAST_PORT)
 
-from utils import milliseconds, upython, safe_int, num_bits_set
+from utils import milliseconds, ticks_diff, upython, safe_int, sleep_ms
 
 if upython:
     import machine
@@ -71,8 +75,6 @@ import uaiohttpclient as aiohttp
 
 BANDS = ('NoBand', '160M', '80M', '60M', '40M', '30M', '20M', '17M', '15M', '12M', '10M', '6M', '2M', '70cm', 'NoBand',
          'NoBand')
-MASKS = (0x0000, 0x0001, 0x0002, 0x0004, 0x0008, 0x0010, 0x0020, 0x0040, 0x0080, 0x0100, 0x0200, 0x0400, 0x800, 0x1000,
-         0x0000, 0x0000)
 # noinspection PyUnboundLocalVariable
 _MIN_BAND = const(1)
 _MAX_BAND = const(13)
@@ -105,36 +107,71 @@ _MSG_BTN_4 = const(4)
 _MSG_POWER_SENSE = const(10)
 _MSG_NETWORK_CHANGE = const(20)
 _MSG_NETWORK_UPDOWN = const(50)
-_MSG_LCD_LINE0 = const(90)
-_MSG_LCD_LINE1 = const(91)
 _MSG_BAND_CHANGE = const(100)
 _MSG_ANTENNA_RESPONSE = const(202)
 _MSG_UDP_RESPONSE = const(203)
 _MSG_UDP_TIMEOUT = const(204)
+_MSG_CONFIRM_TIMEOUT = const(205)
 
 # http api status for failures
 _API_STATUS_TIMEOUT = const(-1)
 _API_STATUS_ERROR = const(-2)
 _API_STATUS_READ_ERROR = const(-3)
 
-# set up message queue
-msgq = RingbufQueue(32)
+_STATUS_WAIT = 10.0  # seconds, longest time /api/status?since= waits for a state change
+
+# how old the last switch status broadcast can be before the other radio's antenna is not trusted.
+_IN_USE_STALE_MS = const(3000)
+
+# default band data settling, see config band_settle_ms and band_settle_samples.
+_BAND_SETTLE_MS = const(10)
+_BAND_SETTLE_SAMPLES = const(3)
+
+# message queue priority lanes, lower numbered lanes are always served first.
+_LANE_CONTROL = const(0)  # band and inhibit-relevant events
+_LANE_NORMAL = const(1)  # switch status and responses, buttons, network
+_MSG_LANES = {_MSG_BAND_CHANGE: _LANE_CONTROL,
+              _MSG_POWER_SENSE: _LANE_CONTROL,
+              _MSG_UDP_TIMEOUT: _LANE_CONTROL,
+              _MSG_CONFIRM_TIMEOUT: _LANE_CONTROL,
+              }
+
+
+_MSG_BATCH_SIZE = const(4)  # most messages msg_loop takes from the queue per wakeup
+
+# state update messages where only the latest value matters.  a newer one replaces an unconsumed older one.
+_COALESCED_MSGS = (_MSG_BAND_CHANGE, _MSG_UDP_RESPONSE)
+
+
+def msg_lane(msg):
+    return _MSG_LANES.get(msg[0], _LANE_NORMAL)
+
+
+def msg_key(msg):
+    m0 = msg[0]
+    return m0 if m0 in _COALESCED_MSGS else None
+
+
+# set up message queue and the table of message handlers
+msgq = RingbufQueue(16, lanes=2, lane_func=msg_lane, key_func=msg_key)
+dispatcher = MessageDispatcher()
 
 # other I/O setup
 onboard = machine.Pin('LED', machine.Pin.OUT, value=1)  # turn on right away
 red_led = machine.Pin(0, machine.Pin.OUT, value=0)  # Red LED on GPIO0 / pin 1
 blinky = machine.Pin(14, machine.Pin.OUT, value=0)  # diagnostic LED on GPIO14 / pin 19
 
+# all the inputs are read by one scanner task.  it waits for pin change interrupts when the inputs are steady;
+# set _USE_IRQ_INPUTS False to poll them every 50 ms instead.
+_USE_IRQ_INPUTS = True
+inputs = InputScanner(msgq, use_irq=_USE_IRQ_INPUTS)
+
 # push buttons on display board on GPIO10-13
 sw1 = machine.Pin(13, machine.Pin.IN, machine.Pin.PULL_UP)  # mode button input on GPIO13 / pin 17
-sw2 = machine.Pin(12, machine.Pin.IN, machine.Pin.PULL_UP)  # mode button input on GPIO12 / pin 16
-sw3 = machine.Pin(11, machine.Pin.IN, machine.Pin.PULL_UP)  # mode button input on GPIO11 / pin 15
-sw4 = machine.Pin(10, machine.Pin.IN, machine.Pin.PULL_UP)  # mode button input on GPIO10 / pin 14
-
-Button(sw1, msgq, (_MSG_BTN_1, 0), (_MSG_BTN_1, 1))  # SW1
-Button(sw2, msgq, (_MSG_BTN_2, 0), (_MSG_BTN_2, 1))
-Button(sw3, msgq, (_MSG_BTN_3, 0), (_MSG_BTN_3, 1))
-Button(sw4, msgq, (_MSG_BTN_4, 0), (_MSG_BTN_4, 1))  # SW 4
+inputs.add_button(13, (_MSG_BTN_1, 0), (_MSG_BTN_1, 1))  # SW1, GPIO13 / pin 17
+inputs.add_button(12, (_MSG_BTN_2, 0), (_MSG_BTN_2, 1))  # SW2, GPIO12 / pin 16
+inputs.add_button(11, (_MSG_BTN_3, 0), (_MSG_BTN_3, 1))  # SW3, GPIO11 / pin 15
+inputs.add_button(10, (_MSG_BTN_4, 0), (_MSG_BTN_4, 1))  # SW4, GPIO10 / pin 14
 
 # LCD display on display board on GPIO pins
 # RW is hardwired to GPIO7,
@@ -146,18 +183,65 @@ lcd = LCD((8, 6, 5, 4, 3, 2), cols=20)
 # auxbus = machine.Pin(15, machine.Pin.IN, machine.Pin.PULL_UP)  # AUXBUS data input on GPIO15 (maybe)
 inhibit_pin = machine.Pin(16, machine.Pin.OUT, value=0)  # TX inhibit control on GPIO16
 
-band0 = machine.Pin(17, machine.Pin.IN, machine.Pin.PULL_UP)  # BAND0 data input on GPIO17
-band1 = machine.Pin(18, machine.Pin.IN, machine.Pin.PULL_UP)  # BAND1 data input on GPIO18
-band2 = machine.Pin(19, machine.Pin.IN, machine.Pin.PULL_UP)  # BAND2 data input on GPIO19
-band3 = machine.Pin(20, machine.Pin.IN, machine.Pin.PULL_UP)  # BAND3 data input on GPIO20
-band_detector = FourBits([band3, band2, band1, band0], msgq, (_MSG_BAND_CHANGE, 0))
+# band change traces, from band detection to inhibit release.  the trace id rides along as msg[2].
+band_traces = BandTraces()
+current_trace = 0  # trace of the band change being worked on, 0 if none
+edge_trace = 0  # trace started at the first read of the band data change that is settling
+
+
+def on_band_bits_edge(bits):
+    """
+    called by the band detector as soon as the band data changes, before the new data has settled.
+    inhibit transmit right away; msg_loop releases it once the right antenna is confirmed.
+    the trace starts here, so it includes the settle time.
+    """
+    global edge_trace
+    set_inhibit(1)
+    edge_trace = band_traces.start(bits)
+
+
+def on_band_bits_change(bits):
+    """
+    called by the band detector when the new band data has settled, before the band change message is queued.
+    :return: the trace id for this band change, which the band detector adds to the band change message.
+    """
+    band_traces.settle(edge_trace, bits)
+    return edge_trace
+
+
+# BAND3..BAND0 data inputs on GPIO20..GPIO17.  the radio does not switch the four lines at the same instant, so
+# new band data must settle before it is accepted; the codes seen on the way are counted as transients.
+band_detector = inputs.add_bits((20, 19, 18, 17), (_MSG_BAND_CHANGE, 0), on_change=on_band_bits_change,
+                                debounce_ms=_BAND_SETTLE_MS, samples=_BAND_SETTLE_SAMPLES,
+                                on_edge=on_band_bits_edge)
 poweron_pin = machine.Pin(21, machine.Pin.OUT, value=0)  # power on control on GPIO21
-powersense = machine.Pin(22, machine.Pin.IN, machine.Pin.PULL_UP)  # power sense input on GPIO22
-GPIO_Pin(powersense, msgq, (_MSG_POWER_SENSE, 0), (_MSG_POWER_SENSE, 1))
+inputs.add_pin(22, (_MSG_POWER_SENSE, 0), (_MSG_POWER_SENSE, 1))  # power sense input on GPIO22
+inputs.start()
 
 timer_mgr = timer_manager.TimerManager()
 udp_timeout_timer = -1
 
+# antenna selection confirmation.  after an antenna is requested, a status broadcast must show it selected
+# before the deadline, or the request is sent again.  inhibit stays asserted until it is confirmed.
+_CONFIRM_DEADLINE = 1.5  # seconds
+_CONFIRM_RETRIES = const(2)
+confirm_timer = -1
+confirm_antenna = -1  # the antenna (1-8) waiting for confirmation, -1 if none
+confirm_start_ms = 0
+confirm_retries = 0
+confirm_timeouts = 0
+confirm_failures = 0
+confirm_latency = Histogram((50, 100, 200, 500, 1000, 2000, 5000))  # milliseconds, request to confirmation
+
+# UDP status receiver and its link-quality counters, which outlive the receiver.
+link_stats = LinkStats()
+receive_broadcasts = None
+broadcast_receiver_task = None
+
+# message queue recorder, started and stopped with /api/recorder.  replay recordings with src/replay/replay.py
+_RECORDING_FILENAME = 'data/messages.rec'
+recorder = None
+
 CONTENT_DIR = 'content/'
 
 DEFAULT_SECRET = 'selector'
@@ -167,30 +251,18 @@ DEFAULT_WEB_PORT = 80
 # globals...
 ap_mode = False
 keep_running = True
-current_antenna = -1
-current_antenna_name = 'Unknown Antenna'
-current_band_number = 0
-radio_name = 'Unknown Rig'
-antenna_names = []
-antenna_bands = []
-band_antennae = []  # list of antennas that could work on the current band.
-network_connected = False
-radio_number = 0
-radio_power = False
-switch_connected = False
+inventory = AntennaInventory()  # the antenna switch's antennas, shared by everything that needs them.
+state = SelectorState()  # radio, antenna, switch and display state.  change it with state.update().
+band_prefs = [0] * len(BANDS)  # per band number, the antenna (1-8) last confirmed on that band, 0 for none.
+band_antennae = ()  # the candidate antennas (0-7) for the band, in the order taken at the band change
+antennae_band = 0  # the band number band_antennae was taken for
 switch_host = None
 switch_name = ''
-switch_timeouts = 0
-
-# well-loved status messages
-ui_pages = [['', ''], ['', '']]
 
 # UI state machine data
 _RADIO_DATA_PAGE = const(0)
 _NETWORK_DATA_PAGE = const(1)
-
-ui_page = _RADIO_DATA_PAGE
-current_antenna_list_index = 0
+_LINK_DATA_PAGE = const(2)
 
 config = ConfigData()
 
@@ -213,50 +285,50 @@ async def api_response(resp, msg, q):
         logging.exception('did not read payload', 'main:api_response', ex)
         payload = b'api read error'
         status = _API_STATUS_READ_ERROR
-    if logging.should_log(logging.DEBUG):
-        logging.debug(f'api call returned {payload}', 'main:api_response')
+    logging.debug('api call returned %s', 'main:api_response', payload)
     data = (status, payload)  # copy the existing http status from the msg tuple
-    new_msg = (msg[0], data)
+    new_msg = (msg[0], data) + msg[2:]  # keep the trace id, if any
     await q.put(new_msg)
 
 
 async def call_api(url, msg, q):
-    if logging.should_log(logging.DEBUG):
-        logging.debug(f'calling api {url}', 'main:call_api')
+    logging.debug('calling api %s', 'main:call_api', url)
     gc.collect()
     if upython and logging.should_log(logging.DEBUG):
         free = gc.mem_free()
         alloc = gc.mem_alloc()
         pct_free = free / (free + alloc) * 100
-        logging.debug(f'{alloc} allocated, {free} free {pct_free:6.2f}% free.', 'main:call_api')
+        logging.debug('%d allocated, %d free %6.2f%% free.', 'main:call_api', alloc, free, pct_free)
     t0 = milliseconds()
     try:
-        resp = await asyncio.wait_for(aiohttp.request("GET", url), 0.5)
+        resp = await asyncio.wait_for(aiohttp.request(b'GET', url), 0.5)
     except asyncio.TimeoutError:  # as ex:
-        dt = milliseconds() - t0
+        dt = ticks_diff(milliseconds(), t0)
         errmsg = b'timed out on api call to "%s" after %d ms' % (url, dt)
         logging.warning(errmsg, 'main:call_api')
-        msg = (msg[0], (_API_STATUS_TIMEOUT, errmsg))
+        msg = (msg[0], (_API_STATUS_TIMEOUT, errmsg)) + msg[2:]
         await q.put(msg)
     except Exception as ex:
-        dt = milliseconds() - t0
+        dt = ticks_diff(milliseconds(), t0)
         errmsg = b'failed to execute api call to "%s" after %d ms' % (url, dt)
         logging.exception(errmsg, 'main:call_api', ex)
-        msg = (msg[0], (_API_STATUS_ERROR, errmsg))
+        msg = (msg[0], (_API_STATUS_ERROR, errmsg)) + msg[2:]
         await q.put(msg)
     else:
         http_status = resp.status
-        if logging.should_log(logging.DEBUG):
-            dt = milliseconds() - t0
-            logging.debug(f'api call to {url} returned {http_status} after {dt} ms', 'main:call_api')
-        msg = (msg[0], (http_status, 'no response'))
+        logging.debug('api call to %s returned %d after %d ms', 'main:call_api', url, http_status,
+                      ticks_diff(milliseconds(), t0))
+        msg = (msg[0], (http_status, 'no response')) + msg[2:]
         asyncio.create_task(api_response(resp, msg, q))
 
 
 async def call_select_antenna_api(new_antenna, msg, q):
-    if logging.should_log(logging.INFO):
-        logging.info(f'requesting antenna {new_antenna}', 'main:call_select_antenna_api')
-    url = b'http://%s/api/select_antenna?radio=%d&antenna=%d' % (switch_host, radio_number, new_antenna)
+    logging.info('requesting antenna %d', 'main:call_select_antenna_api', new_antenna)
+    start_confirmation(new_antenna)
+    if current_trace:
+        band_traces.mark(current_trace, REQUESTED)
+        msg = (msg[0], msg[1], current_trace)
+    url = b'http://%s/api/select_antenna?radio=%d&antenna=%d' % (switch_host, state.radio_number, new_antenna)
     asyncio.create_task(call_api(url, msg, q))
 
 
@@ -271,7 +343,7 @@ async def slash_callback(http, verb, args, reader, writer, request_headers=None)
 # noinspection PyUnusedLocal
 @http_server.route(b'/api/config')
 async def api_config_callback(http, verb, args, reader, writer, request_headers=None):  # callback for '/api/config'
-    global config, switch_host, switch_name, radio_number
+    global config, switch_host, switch_name
     if verb == HTTP_VERB_GET:
         response = dict(config.get_data())
         # response.pop('secret')  # do not return the secret
@@ -293,6 +365,11 @@ async def api_config_callback(http, verb, args, reader, writer, request_headers=
             else:
                 errors = True
                 problems.append('log_level')
+        cfg_log_console = args.get('log_console')
+        if cfg_log_console is not None:
+            log_console = bool(safe_int(cfg_log_console, 0))
+            config['log_console'] = log_console
+            logging.set_console(log_console)
         web_port = args.get('web_port')
         if web_port is not None:
             web_port_int = safe_int(web_port, -2)
@@ -345,7 +422,16 @@ async def api_config_callback(http, verb, args, reader, writer, request_headers=
         switch_name_arg = args.get('switch_name')
         if switch_name_arg is not None:
             switch_name = switch_name_arg
+            inventory.set_switch_name(switch_name)
             config['switch_name'] = switch_name_arg
+        udp_multicast_group = args.get('udp_multicast_group')
+        if udp_multicast_group is not None:
+            udp_multicast_group = udp_multicast_group.strip()
+            if udp_multicast_group == '' or is_multicast_address(udp_multicast_group):
+                config['udp_multicast_group'] = udp_multicast_group
+            else:
+                errors = True
+                problems.append('udp_multicast_group')
         cfg_auto_on = args.get('auto_on')
         if cfg_auto_on is not None:
             auto_on = bool(safe_int(cfg_auto_on, 0))
@@ -354,7 +440,7 @@ async def api_config_callback(http, verb, args, reader, writer, request_headers=
         if cfg_radio_number is not None:
             cfg_radio_number = safe_int(cfg_radio_number, -1)
             if 1 <= cfg_radio_number <= 2:
-                radio_number = cfg_radio_number
+                state.update(radio_number=cfg_radio_number)
                 config['radio_number'] = cfg_radio_number
             else:
                 errors = True
@@ -365,7 +451,7 @@ async def api_config_callback(http, verb, args, reader, writer, request_headers=
             bytes_sent = await http.send_simple_response(writer, http_status, http.CT_TEXT_TEXT, response)
         else:
             response = b'parameter out of range\r\n'
-            logging.error(f'problems {problems}', 'main:api_config_callback')
+            logging.error('problems %s', 'main:api_config_callback', problems)
             http_status = HTTP_STATUS_BAD_REQUEST
             bytes_sent = await http.send_simple_response(writer, http_status, http.CT_TEXT_TEXT, response)
     else:
@@ -392,6 +478,14 @@ async def api_restart_callback(http, verb, args, reader, writer, request_headers
     return bytes_sent, http_status
 
 
+def status_response():
+    return {'lcd_lines': list(state.lcd_lines),
+            'radio_power': state.radio_power,
+            'switch_connected': state.switch_connected,
+            'version': state.version,
+            }
+
+
 @http_server.route(b'/api/status')
 async def api_status_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/status'
     """
@@ -402,26 +496,131 @@ async def api_status_callback(http, verb, args, reader, writer, request_headers=
             "Elecraft K3 No Power",
             "    6 Meter Yagi    "
         ],
-        "radio_power": false
+        "radio_power": false,
+        "version": 42
     }
+    if the since argument is the current state version, waits up to _STATUS_WAIT seconds for the state to change.
     """
-    response = {'lcd_lines': [lcd[0], lcd[1]],
-                'radio_power': radio_power,
-                'switch_connected': switch_connected,
+    since = safe_int(args.get('since', -1), -1)
+    if since == state.version:
+        try:
+            await asyncio.wait_for(state.wait_for_change(since), _STATUS_WAIT)
+        except asyncio.TimeoutError:
+            pass
+    response = status_response()
+    http_status = HTTP_STATUS_OK
+    bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
+    return bytes_sent, http_status
+
+
+# noinspection PyUnusedLocal
+@http_server.route(b'/api/antennas')
+async def api_antennas_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/antennas'
+    """
+    returns the antenna inventory last reported by the antenna switch.
+    """
+    response = inventory.as_dict()
+    http_status = HTTP_STATUS_OK
+    bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
+    return bytes_sent, http_status
+
+
+# noinspection PyUnusedLocal
+@http_server.route(b'/api/metrics')
+async def api_metrics_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/metrics'
+    """
+    returns message handling counts and times, per message type, and message queue counters.
+    """
+    response = {'messages': dispatcher.stats(),
+                'queue': msgq.stats(),
+                'timers': timer_mgr.stats(),
+                'inputs': inputs.stats(),
+                'display': display.stats(),
+                'antenna_confirmation': {'latency_ms': confirm_latency.as_dict(),
+                                         'timeouts': confirm_timeouts,
+                                         'failures': confirm_failures,
+                                         },
                 }
     http_status = HTTP_STATUS_OK
     bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
     return bytes_sent, http_status
 
 
+# noinspection PyUnusedLocal
+@http_server.route(b'/api/traces')
+async def api_traces_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/traces'
+    """
+    returns the recent band change traces, most recent first, with the ms from band detection to each stage.
+    """
+    response = band_traces.as_list()
+    http_status = HTTP_STATUS_OK
+    bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
+    return bytes_sent, http_status
+
+
+# noinspection PyUnusedLocal
+@http_server.route(b'/api/log')
+async def api_log_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/log'
+    """
+    returns the log entries kept in RAM, oldest first.  since=<seq> returns only the entries after seq;
+    pass the seq from the previous response to tail the log.  if since is after the newest entry, the
+    device has restarted: all the entries are returned, with reset true.
+    """
+    response = logging.ring.entries(max(0, safe_int(args.get('since'), 0)))
+    http_status = HTTP_STATUS_OK
+    bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
+    return bytes_sent, http_status
+
+
+# noinspection PyUnusedLocal
+@http_server.route(b'/api/recorder')
+async def api_recorder_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/recorder'
+    """
+    start or stop recording message queue traffic, action=start or action=stop.  returns the recorder status.
+    """
+    global recorder
+    action = args.get('action')
+    http_status = HTTP_STATUS_OK
+    if action == 'start':
+        if recorder is not None:
+            msgq.tap = None
+            recorder.close()
+        try:
+            recorder = MessageRecorder(_RECORDING_FILENAME)
+            msgq.tap = recorder.record
+            logging.info('recording messages to %s', 'main:api_recorder_callback', _RECORDING_FILENAME)
+        except OSError as ose:
+            logging.exception('could not start recorder', 'main:api_recorder_callback', ose)
+            recorder = None
+            http_status = HTTP_STATUS_BAD_REQUEST
+    elif action == 'stop':
+        if recorder is not None:
+            msgq.tap = None
+            recorder.close()
+    elif action is not None:
+        http_status = HTTP_STATUS_BAD_REQUEST
+    response = recorder.as_dict() if recorder is not None else {'recording': False}
+    bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
+    return bytes_sent, http_status
+
+
+# noinspection PyUnusedLocal
+@http_server.route(b'/api/link_stats')
+async def api_link_stats_callback(http, verb, args, reader, writer, request_headers=None):  # '/api/link_stats'
+    """
+    returns UDP status datagram link quality counters per antenna switch.
+    """
+    response = link_stats.as_dict()
+    http_status = HTTP_STATUS_OK
+    bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
+    return bytes_sent, http_status
+
+
 @http_server.route(b'/api/power_on_radio')
 async def api_power_on_radio_callback(http, verb, args, reader, writer, request_headers=None):
     await power_on()
     # send the status response message
-    response = {'lcd_lines': [lcd[0], lcd[1]],
-                'radio_power': radio_power,
-                'switch_connected': switch_connected,
-                }
+    response = status_response()
     http_status = HTTP_STATUS_OK
     bytes_sent = await http.send_simple_response(writer, http_status, http.CT_APP_JSON, response)
     return bytes_sent, http_status
@@ -454,18 +653,43 @@ async def api_button_press(http, verb, args, reader, writer, request_headers=Non
     return bytes_sent, http_status
 
 
-def find_band_antennae(new_band_number: int):
-    mask = MASKS[new_band_number]
-    candidates = [(num_bits_set(antenna_bands[i]), i)
-                  for i in range(len(antenna_bands))
-                  if mask & antenna_bands[i]]
-    candidates.sort()          # sort by bit-count (fewest shared bands first)
-    return [i for _, i in candidates]
-
-
 def set_inhibit(inhibit):
     inhibit_pin.value(inhibit)
     red_led.value(inhibit)
+    state.update(inhibit=inhibit)
+
+
+def start_confirmation(antenna):
+    """
+    start (or restart) the confirmation deadline for a requested antenna.
+    a retry for the same antenna keeps the original start time, so latency covers the whole exchange.
+    """
+    global confirm_antenna, confirm_retries, confirm_start_ms, confirm_timer
+    if antenna != confirm_antenna:
+        confirm_antenna = antenna
+        confirm_retries = 0
+        confirm_start_ms = milliseconds()
+    if confirm_timer >= 0:
+        timer_mgr.cancel_timer(confirm_timer)
+    confirm_timer = timer_mgr.add_timer(delay=_CONFIRM_DEADLINE,
+                                        callback=put_timer_message,
+                                        arg=(_MSG_CONFIRM_TIMEOUT, antenna),
+                                        name='confirm')
+
+
+def end_confirmation(confirmed):
+    global confirm_antenna, confirm_timer
+    if confirm_antenna < 0:
+        return
+    if confirmed:
+        confirm_latency.add(ticks_diff(milliseconds(), confirm_start_ms))
+        band_traces.mark(current_trace, CONFIRMED)
+        if confirm_antenna - 1 in band_antennae:  # so Next/Prev step on from the antenna in use
+            state.update(antenna_list_index=band_antennae.index(confirm_antenna - 1))
+    if confirm_timer >= 0:
+        timer_mgr.cancel_timer(confirm_timer)
+    confirm_timer = -1
+    confirm_antenna = -1
 
 
 async def power_on():
@@ -475,318 +699,421 @@ async def power_on():
     await asyncio.sleep(0.5)
 
 
+def band_candidates(band_number):
+    """
+    get the antennas to try for a band, in order.  the antenna last confirmed on the band is tried first,
+    and the antenna the other radio is using goes last, since the switch would refuse it.  the other radio's
+    antenna is only trusted if the last status broadcast is recent; otherwise, optimistically try them all.
+    :return: tuple of antenna indexes (0-7)
+    """
+    candidates = inventory.band_candidates(band_number)
+    if len(candidates) < 2:
+        return candidates
+    preferred = band_prefs[band_number] - 1
+    if preferred not in candidates:
+        preferred = -1
+    in_use = -1
+    if ticks_diff(milliseconds(), inventory.updated_ms) < _IN_USE_STALE_MS:
+        radio_number = state.radio_number
+        if radio_number == 1:
+            in_use = inventory.radio_2_antenna - 1
+        elif radio_number == 2:
+            in_use = inventory.radio_1_antenna - 1
+        if in_use not in candidates:
+            in_use = -1
+    if in_use == preferred:
+        preferred = -1
+    if preferred < 0 and (in_use < 0 or candidates[-1] == in_use):
+        return candidates
+    ordered = [c for c in candidates if c != preferred and c != in_use]
+    if preferred >= 0:
+        ordered.insert(0, preferred)
+    if in_use >= 0:
+        ordered.append(in_use)
+    return tuple(ordered)
+
+
+def take_band_antennae(band_number):
+    """
+    take the candidate antennas for a band.  the order is kept until the next band change, so that Next/Prev
+    step through the same list even when the preferred or in-use antenna changes.
+    """
+    global band_antennae, antennae_band
+    band_antennae = band_candidates(band_number)
+    antennae_band = band_number
+    return band_antennae
+
+
+def remember_antenna(band_number, antenna):
+    """
+    remember the antenna confirmed on a band.  the config data is written later, by its deferred writer.
+    """
+    if band_prefs[band_number] != antenna:
+        band_prefs[band_number] = antenna
+        config['band_antenna_prefs'] = list(band_prefs)  # a copy, so the config sees the change
+
+
 async def new_band(new_band_number):
-    global band_antennae, current_antenna_list_index
     if new_band_number == 0:
-        logging.warning('new band with invalid band number')
+        logging.warning('new band with invalid band number', 'main:new_band')
         return
-    logging.info(f'new band: {BANDS[new_band_number]}', 'main:new_band')
-    await update_ui_page(_RADIO_DATA_PAGE, f'{radio_name} {BANDS[new_band_number]}', None)
     set_inhibit(1)
-    band_antennae = find_band_antennae(new_band_number)
-    if len(band_antennae) == 0:
-        current_antenna_list_index = -1
-        logging.warning(f'no antenna available for band {BANDS[new_band_number]}', 'main:new_band')
-        #                                           '12345678901234567890'
-        await update_ui_page(_RADIO_DATA_PAGE, None, '*No Antenna for Band*')
+    logging.info('new band: %s', 'main:new_band', BANDS[new_band_number])
+    update_ui_page(_RADIO_DATA_PAGE, f'{state.radio_name} {BANDS[new_band_number]}', None)
+    antennae = take_band_antennae(new_band_number)
+    if len(antennae) == 0:
+        state.update(antenna_list_index=-1)
+        logging.warning('no antenna available for band %s', 'main:new_band', BANDS[new_band_number])
+        #                                     '12345678901234567890'
+        update_ui_page(_RADIO_DATA_PAGE, None, '*No Antenna for Band*')
     else:
-        if switch_connected:
-            logging.info(f'new band: {BANDS[new_band_number]} got band_antennae {band_antennae}', 'main:new_band')
-            await update_ui_page(_RADIO_DATA_PAGE, None, 'Requesting Antenna')
-            current_antenna_list_index = 0
-            await call_select_antenna_api(band_antennae[current_antenna_list_index] + 1,
-                                          (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
+        if state.switch_connected:
+            logging.info('new band: %s got candidate antennas %s', 'main:new_band', BANDS[new_band_number], antennae)
+            update_ui_page(_RADIO_DATA_PAGE, None, 'Requesting Antenna')
+            state.update(antenna_list_index=0)
+            await call_select_antenna_api(antennae[0] + 1, (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
         else:
             logging.warning('band changed but switch is not connected', 'main:new_band')
             # do not need to update 'radio' display, it should already indicate that the switch is not connected.
 
 
 async def change_band_antenna(up=True):
-    global current_antenna_list_index
-    logging.info(f'change_band_antenna(up={up})', 'main:change_band_antenna')
-    if len(band_antennae) <= 1:
+    logging.info('change_band_antenna(up=%s)', 'main:change_band_antenna', up)
+    antennae = band_antennae
+    if antennae_band != state.band_number or len(antennae) == 0:  # not taken yet, or the inventory was empty
+        antennae = take_band_antennae(state.band_number)
+        if state.antenna - 1 in antennae:
+            state.update(antenna_list_index=antennae.index(state.antenna - 1))
+    if len(antennae) <= 1:
         return False
     if up:
-        current_antenna_list_index += 1
-        if current_antenna_list_index >= len(band_antennae):
-            current_antenna_list_index = 0
+        index = (state.antenna_list_index + 1) % len(antennae)
     else:  # down, yeah
-        current_antenna_list_index -= 1
-        if current_antenna_list_index < 0:
-            current_antenna_list_index = len(band_antennae) - 1
-    await call_select_antenna_api(band_antennae[current_antenna_list_index] + 1, (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
+        index = (state.antenna_list_index - 1) % len(antennae)
+    state.update(antenna_list_index=index)
+    await call_select_antenna_api(antennae[index] + 1, (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
     return True
 
 
-async def update_ui_page(page, line1=None, line2=None):
-    global ui_pages
-    updated = False
-    if 0 <= page < len(ui_pages):
-        if line1 is not None and ui_pages[page][0] != line1:
-            ui_pages[page][0] = line1
-            updated = True
-        if line2 is not None and ui_pages[page][1] != line2:
-            ui_pages[page][1] = line2
-            updated = True
-        if updated:
-            await show_ui_page(page)
+def update_ui_page(page, line1=None, line2=None):
+    display.update_page(page, line1, line2)
 
 
-async def show_ui_page(page):
-    global ui_page
-    if 0 <= page < len(ui_pages):
-        await msgq.put((_MSG_LCD_LINE0, ui_pages[page][0]))  # update display
-        await msgq.put((_MSG_LCD_LINE1, ui_pages[page][1]))  # update display
-        ui_page = page
+def update_link_page():
+    slot = link_stats.find(switch_name)
+    if slot < 0:
+        #                                         '12345678901234567890'
+        update_ui_page(_LINK_DATA_PAGE, 'Switch Link', 'no datagrams')
+    else:
+        stats = link_stats.get(slot)
+        update_ui_page(_LINK_DATA_PAGE,
+                       f'rx {stats["received"]} gap {stats["gaps"]}',
+                       f'jit {stats["jitter_ms"]}ms err {stats["decode_errors"]}')
 
 
-async def msg_loop(q):
-    global antenna_bands, antenna_names, band_antennae, \
-        current_antenna, current_antenna_list_index, current_antenna_name, current_band_number, \
-        network_connected, radio_name, radio_power, \
-        switch_connected, switch_timeouts, udp_timeout_timer
+def show_ui_page(page):
+    display.show_page(page)
 
-    while True:
-        msg = await q.get()
-        t0 = milliseconds()
-        m0 = msg[0]
-        m1 = msg[1]
-        # if logging.should_log(logging.DEBUG):
-        #    logging.debug(f'msg received: {m0} : {m1}', 'main:msg_loop')
-        if m0 == 0:
-            logging.error(f'impossible message 0')
-        elif m0 == _MSG_BTN_1:  # show radio status
-            if m1 == 0:  # short press
-                await show_ui_page(_RADIO_DATA_PAGE)
-        elif m0 == _MSG_BTN_2:  # show network status
-            if m1 == 0:  # short press
-                await show_ui_page(_NETWORK_DATA_PAGE)
-        elif m0 == _MSG_BTN_3:  # UP button
-            if m1 == 0:  # short press
-                if ui_page == _RADIO_DATA_PAGE:
-                    # next antenna for this band.
-                    await change_band_antenna(up=True)
-        elif m0 == _MSG_BTN_4:  # DOWN button
-            if m1 == 0:  # short press
-                if ui_page == _RADIO_DATA_PAGE:
-                    # previous antenna for this band.
-                    await change_band_antenna(up=False)
-        elif m0 == _MSG_POWER_SENSE:  # power sense changed
-            if m1 == 0:
-                # detect missing radio.  do something about it.
-                radio_power = True
-                logging.info('radio power is on', 'main:msg_loop')
-            else:
-                radio_power = False
-                logging.info('radio power is off', 'main:msg_loop')
-                await update_ui_page(_RADIO_DATA_PAGE, f'{radio_name} No Power', None)
-        elif m0 == _MSG_NETWORK_UPDOWN:
-            # network up/down
-            if logging.should_log(logging.DEBUG):
-                logging.debug(f'msg received: {msg}', 'main:msg_loop:MSG_NETWORK_UPDOWN')
-            if m1 == 1:  # network is up!
-                logging.info('Network is up!', 'main:msg_loop:_MSG_NETWORK_UPDOWN')
-                network_connected = True
-                if udp_timeout_timer < 0:
-                    udp_timeout_timer = timer_mgr.add_timer(delay=5.0,
-                                                            callback=put_timer_message,
-                                                            arg=(_MSG_UDP_TIMEOUT, (0, 'udp message timeout')),
-                                                            auto_reset=True)
-            else:
-                logging.warning('Network is DOWN!', 'main:msg_loop:_MSG_NETWORK_UPDOWN')
-                network_connected = False
-                global receive_broadcasts, broadcast_receiver_task
-                if receive_broadcasts is not None:
-                    receive_broadcasts.stop()
-                receive_broadcasts = None
-                broadcast_receiver_task = None
-        elif m0 == _MSG_LCD_LINE0:  # LCD line 1
-            lcd[0] = f'{m1:^20s}'
-            if logging.should_log(logging.INFO):
-                logging.info(f'LCD0: "{lcd[0]}"', 'main:msg_loop')
-        elif m0 == _MSG_LCD_LINE1:  # LCD line 2
-            lcd[1] = f'{m1:^20s}'
-            if logging.should_log(logging.INFO):
-                logging.info(f'LCD1: "{lcd[1]}"', 'main:msg_loop')
-        elif m0 == _MSG_BAND_CHANGE:  # band change detected
-            if logging.should_log(logging.INFO):
-                logging.info(f'band change, power = {radio_power}, m1={m1}', 'main:msg_loop')
-            if not radio_power:
-                await update_ui_page(_RADIO_DATA_PAGE, f'{radio_name} No Power', None)
+
+def on_display_paint(line0, line1):
+    state.update(lcd_lines=(line0, line1), ui_page=display.page)
+    logging.info('LCD: "%s" "%s"', 'main:on_display_paint', line0, line1)
+
+
+# the pages of the UI, painted on the LCD at most 10 times a second.
+display = Display(lcd, 3, cols=20, refresh_ms=100, on_paint=on_display_paint)
+
+
+# message handlers, dispatched by msg_loop.
+@dispatcher.handler(_MSG_BTN_1)
+async def on_button_1(msg):  # show radio status
+    if msg[1] == 0:  # short press
+        show_ui_page(_RADIO_DATA_PAGE)
+
+
+@dispatcher.handler(_MSG_BTN_2)
+async def on_button_2(msg):  # show network status, press again for switch link quality
+    if msg[1] == 0:  # short press
+        if display.page == _NETWORK_DATA_PAGE:
+            update_link_page()
+            if display.page != _LINK_DATA_PAGE:
+                show_ui_page(_LINK_DATA_PAGE)
+        else:
+            show_ui_page(_NETWORK_DATA_PAGE)
+
+
+@dispatcher.handler(_MSG_BTN_3)
+async def on_button_3(msg):  # UP button
+    if msg[1] == 0:  # short press
+        if display.page == _RADIO_DATA_PAGE:
+            # next antenna for this band.
+            await change_band_antenna(up=True)
+
+
+@dispatcher.handler(_MSG_BTN_4)
+async def on_button_4(msg):  # DOWN button
+    if msg[1] == 0:  # short press
+        if display.page == _RADIO_DATA_PAGE:
+            # previous antenna for this band.
+            await change_band_antenna(up=False)
+
+
+@dispatcher.handler(_MSG_POWER_SENSE)
+async def on_power_sense(msg):  # power sense changed
+    if msg[1] == 0:
+        # detect missing radio.  do something about it.
+        state.update(radio_power=True)
+        logging.info('radio power is on', 'main:on_power_sense')
+    else:
+        state.update(radio_power=False)
+        logging.info('radio power is off', 'main:on_power_sense')
+        update_ui_page(_RADIO_DATA_PAGE, f'{state.radio_name} No Power', None)
+
+
+@dispatcher.handler(_MSG_NETWORK_UPDOWN)
+async def on_network_updown(msg):
+    global udp_timeout_timer, receive_broadcasts, broadcast_receiver_task
+    logging.debug('msg received: %s', 'main:on_network_updown', msg)
+    if msg[1] == 1:  # network is up!
+        logging.info('Network is up!', 'main:on_network_updown')
+        state.update(network_connected=True)
+        if udp_timeout_timer < 0:
+            udp_timeout_timer = timer_mgr.add_timer(delay=5.0,
+                                                    callback=put_timer_message,
+                                                    arg=(_MSG_UDP_TIMEOUT, (0, 'udp message timeout')),
+                                                    auto_reset=True,
+                                                    name='udp_timeout')
+    else:
+        logging.warning('Network is DOWN!', 'main:on_network_updown')
+        state.update(network_connected=False)
+        if receive_broadcasts is not None:
+            receive_broadcasts.stop()
+        receive_broadcasts = None
+        broadcast_receiver_task = None
+
+
+@dispatcher.handler(_MSG_BAND_CHANGE)
+async def on_band_change(msg):  # band change detected
+    global current_trace
+    m1 = msg[1]
+    current_trace = msg[2] if len(msg) > 2 else 0
+    band_traces.mark(current_trace, DISPATCHED)
+    logging.info('band change, power = %s, m1=%d', 'main:on_band_change', state.radio_power, m1)
+    if not state.radio_power:
+        update_ui_page(_RADIO_DATA_PAGE, f'{state.radio_name} No Power', None)
+        set_inhibit(1)
+    else:
+        if 0 <= m1 < len(ELECRAFT_BAND_MAP):
+            band_number = ELECRAFT_BAND_MAP[m1]
+            state.update(band_number=band_number)
+            if len(inventory.antenna_names) > 0:  # only change bands if there are antennas.
+                await new_band(band_number)
+            else:  # update the display with the band name
+                update_ui_page(_RADIO_DATA_PAGE, f'{state.radio_name} {BANDS[band_number]}', None)
+        else:
+            errmsg = f'unknown band # {m1}'
+            logging.error(errmsg, 'main:on_band_change')
+            update_ui_page(_RADIO_DATA_PAGE, errmsg, None)
+            set_inhibit(1)
+
+
+@dispatcher.handler(_MSG_ANTENNA_RESPONSE)
+async def on_antenna_response(msg):  # http select antenna response
+    m1 = msg[1]
+    if len(msg) > 2:
+        band_traces.mark(msg[2], RESPONDED)
+    http_status = m1[0]
+    payload = m1[1].decode().strip()
+    if http_status == 0:  # api call failed
+        #                                                    '12345678901234567890'
+        state.update(switch_connected=False, antenna=-1, antenna_name='_No Antenna Switch!_')
+        update_ui_page(_RADIO_DATA_PAGE, None, state.antenna_name)
+    elif http_status == HTTP_STATUS_OK:
+        logging.debug('antenna request was successful', 'main:on_antenna_response')
+    elif HTTP_STATUS_BAD_REQUEST <= http_status <= 499:
+        # step through the list taken at the band change; a list built now may be in a different order.
+        index = state.antenna_list_index
+        if len(band_antennae) == 0 or index >= len(band_antennae) - 1:
+            logging.warning('no antenna available for band', 'main:on_antenna_response')
+            end_confirmation(False)
+            update_ui_page(_RADIO_DATA_PAGE, None, f'*{payload}*')
+            set_inhibit(1)
+        else:
+            # if there is another antenna candidate, try to get it
+            logging.info('API call returned HTTP status %d %s', 'main:on_antenna_response', http_status, m1)
+            update_ui_page(_RADIO_DATA_PAGE, None, '')
+            index += 1
+            state.update(antenna_list_index=index)
+            await call_select_antenna_api(band_antennae[index] + 1, (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
+    else:  # some other HTTP/status code...
+        logging.warning('select antenna API call returned status %d %s', 'main:on_antenna_response', http_status, m1)
+
+
+@dispatcher.handler(_MSG_UDP_RESPONSE)
+async def on_udp_response(msg):
+    global current_trace
+    # msg[1] is the antenna inventory, already updated by the receiver from our switch's datagram.
+    m1 = msg[1]
+    if not state.switch_connected:
+        logging.info('switch_connected False to True transition', 'main:on_udp_response')
+
+    # reset switch message timer.
+    if udp_timeout_timer >= 0:
+        timer_mgr.reset_timer(udp_timeout_timer)
+    radio_1_antenna = m1.radio_1_antenna
+    radio_2_antenna = m1.radio_2_antenna
+    if logging.should_log(logging.DEBUG):
+        logging.debug('radio_1_antenna: %d radio_2_antenna:%d', 'main:on_udp_response', radio_1_antenna,
+                      radio_2_antenna)
+        logging.debug('radio_names: %s', 'main:on_udp_response', m1.radio_names)
+        logging.debug('antenna_names: %s', 'main:on_udp_response', m1.antenna_names)
+        logging.debug('antenna_bands: %s', 'main:on_udp_response', m1.antenna_bands)
+
+    radio_number = state.radio_number
+    if radio_number == 1 or radio_number == 2:
+        radio_name = m1.radio_names[radio_number - 1]
+    else:
+        radio_name = f'unknown radio {radio_number}'
+    current_antenna = -1
+    if radio_number == 1:
+        current_antenna = radio_1_antenna
+    elif radio_number == 2:
+        current_antenna = radio_2_antenna
+    if current_antenna == 0:
+        current_antenna_name = "Antenna DISCONNECTED"
+    elif 1 <= current_antenna <= len(m1.antenna_names):
+        current_antenna_name = m1.antenna_names[current_antenna - 1]
+    else:
+        current_antenna_name = f'unknown antenna {current_antenna}'
+    state.update(switch_connected=True, switch_timeouts=0, radio_name=radio_name, antenna=current_antenna,
+                 antenna_name=current_antenna_name)
+    if current_antenna == confirm_antenna:
+        end_confirmation(True)
+    band_number = state.band_number
+    candidate_count = len(inventory.band_candidates(band_number))  # the cached index, does not allocate
+    if candidate_count > 1:
+        display_antenna_name = f'{current_antenna_name} + {candidate_count - 1}'
+    else:
+        display_antenna_name = current_antenna_name
+
+    update_ui_page(_RADIO_DATA_PAGE, None, display_antenna_name)
+
+    if not state.radio_power:
+        errmsg = f'{radio_name} No Power'
+        # if logging.should_log(logging.DEBUG):  # doesn't matter
+        logging.debug(errmsg, 'main:on_udp_response:NoPower')
+        update_ui_page(_RADIO_DATA_PAGE, errmsg, None)
+        set_inhibit(1)
+    else:
+        if band_number < 1 or band_number > 13:
+            # this does not look like a valid band choice, read the band data again.
+            inputs.invalidate(band_detector)
+        else:
+            errmsg = f'{radio_name} {BANDS[band_number]}'
+            update_ui_page(_RADIO_DATA_PAGE, errmsg, None)
+            if current_antenna < 1 or current_antenna > len(m1.antenna_bands):
                 set_inhibit(1)
             else:
-                if 0 <= m1 < len(ELECRAFT_BAND_MAP):
-                    current_band_number = ELECRAFT_BAND_MAP[m1]
-                    if len(antenna_names) > 0:  # only change bands if there are antennas.
-                        await new_band(current_band_number)
-                    else:  # update the display with the band name
-                        await update_ui_page(_RADIO_DATA_PAGE, f'{radio_name} {BANDS[current_band_number]}', None)
-                else:
-                    errmsg = f'unknown band # {m1}'
-                    logging.error(errmsg)
-                    await update_ui_page(_RADIO_DATA_PAGE, errmsg, None)
-                    set_inhibit(1)
-        elif m0 == _MSG_ANTENNA_RESPONSE:  # http select antenna response
-            http_status = m1[0]
-            payload = m1[1].decode().strip()
-            if http_status == 0:  # api call failed
-                switch_connected = False
-                current_antenna = -1
-                current_antenna_name = '_No Antenna Switch!_'
-                #                      '12345678901234567890'
-                await update_ui_page(_RADIO_DATA_PAGE, None, current_antenna_name)
-            elif http_status == HTTP_STATUS_OK:
-                logging.debug('antenna request was successful', 'main:msg_loop')
-            elif HTTP_STATUS_BAD_REQUEST <= http_status <= 499:
-                if len(band_antennae) == 0 or current_antenna_list_index == len(band_antennae) - 1:
-                    logging.warning(f'no antenna available for band ')
-                    await update_ui_page(_RADIO_DATA_PAGE, None, f'*{payload}*')
-                    set_inhibit(1)
-                else:
-                    # if there is another antenna candidate, try to get it
-                    logging.info(f'API call returned HTTP status {http_status} {m1}',
-                                 'main:msg_loop:MSG_ANTENNA_RESPONSE')
-                    await update_ui_page(_RADIO_DATA_PAGE, None, '')
-                    if current_antenna_list_index < len(band_antennae) - 1:
-                        current_antenna_list_index = current_antenna_list_index + 1
-                    await call_select_antenna_api(band_antennae[current_antenna_list_index] + 1,
-                                                  (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
-            else:  # some other HTTP/status code...
-                logging.warning(f'select antenna API call returned status {http_status} {m1}', 'main:msg_loop')
-        elif m0 == _MSG_UDP_RESPONSE:
-            # logging.debug(f'udp message {m1}', 'main:msg_loop:_MSG_UDP_RESPONSE')
-            if len(m1) == 21:
-                msg_switch_name = m1[SWITCH_NAME_OFFSET]
-                if msg_switch_name == switch_name:  # this is a message for us.
-                    switch_timeouts = 0
-                    if not switch_connected:
-                        logging.info('switch_connected False to True transition',
-                                     'main:msg_loop:_MSG_UDP_RESPONSE')
-                    switch_connected = True
-
-                    # reset switch message timer.
-                    if udp_timeout_timer >= 0:
-                        timer_mgr.reset_timer(udp_timeout_timer)
-                    radio_1_antenna = safe_int(m1[RADIO_1_ANTENNA_OFFSET])
-                    radio_2_antenna = safe_int(m1[RADIO_2_ANTENNA_OFFSET])
-                    radio_names = [m1[x + RADIO_NAMES_OFFSET] for x in range(RADIO_NAMES_SIZE)]
-                    antenna_names = [m1[x + ANTENNA_NAMES_OFFSET] for x in range(ANTENNA_NAMES_SIZE)]
-                    antenna_bands = [m1[x + ANTENNA_BANDS_OFFSET] for x in range(ANTENNA_BANDS_SIZE)]
-                    if logging.should_log(logging.DEBUG):
-                        logging.debug(f'radio_1_antenna: {radio_1_antenna} radio_2_antenna:{radio_2_antenna}' 'main:msg_loop:_MSG_UDP_RESPONSE')
-                        logging.debug(f'radio_names: {radio_names}' 'main:msg_loop:_MSG_UDP_RESPONSE')
-                        logging.debug(f'antenna_names: {antenna_names}', 'main:msg_loop:_MSG_UDP_RESPONSE')
-                        logging.debug(f'antenna_bands: {antenna_bands}', 'main:msg_loop:_MSG_UDP_RESPONSE')
-
-                    if radio_number == 1 or radio_number == 2:
-                        radio_name = radio_names[radio_number - 1]
-                    else:
-                        radio_name = f'unknown radio {radio_number}'
-                    current_antenna = -1
-                    if radio_number == 1:
-                        current_antenna = radio_1_antenna
-                    elif radio_number == 2:
-                        current_antenna = radio_2_antenna
-                    if current_antenna == 0:
-                        current_antenna_name = "Antenna DISCONNECTED"
-                    elif 1 <= current_antenna <= 8:
-                        current_antenna_name = antenna_names[current_antenna - 1]
-                    else:
-                        current_antenna_name = f'unknown antenna {current_antenna}'
-                    if len(band_antennae) > 1:
-                        display_antenna_name = f'{current_antenna_name} + {len(band_antennae) - 1}'
+                if MASKS[band_number] & m1.antenna_bands[current_antenna - 1]:
+                    set_inhibit(0)
+                    remember_antenna(band_number, current_antenna)
+                    if current_trace:
+                        band_traces.mark(current_trace, RELEASED)
+                        current_trace = 0
+                    if candidate_count > 1:
+                        display_antenna_name = f'{current_antenna_name} + {candidate_count - 1}'
                     else:
                         display_antenna_name = current_antenna_name
+                    update_ui_page(_RADIO_DATA_PAGE, None, display_antenna_name)
+                else:
+                    set_inhibit(1)
+                    # try to get the right band...
+                    await new_band(band_number)
+
+
+@dispatcher.handler(_MSG_UDP_TIMEOUT)
+async def on_udp_timeout(msg):
+    switch_timeouts = state.switch_timeouts + 1
+    state.update(switch_timeouts=switch_timeouts)
+    logging.debug('switch timeouts=%d', 'main:on_udp_timeout', switch_timeouts)
+    if switch_timeouts == 1:
+        if state.switch_connected:
+            logging.warning('switch_connected True to False transition', 'main:on_udp_timeout')
+        set_inhibit(1)
+        state.update(switch_connected=False, antenna=-1, antenna_name='No Antenna Switch!')
+        update_ui_page(_RADIO_DATA_PAGE, None, state.antenna_name)
+
+
+@dispatcher.handler(_MSG_CONFIRM_TIMEOUT)
+async def on_confirm_timeout(msg):
+    global confirm_failures, confirm_retries, confirm_timeouts
+    antenna = msg[1]
+    if antenna != confirm_antenna:  # confirmed, or superseded by another request, after the timer fired.
+        return
+    confirm_timeouts += 1
+    set_inhibit(1)
+    if confirm_retries < _CONFIRM_RETRIES:
+        confirm_retries += 1
+        logging.warning('antenna %d not confirmed, requesting again, retry %d', 'main:on_confirm_timeout',
+                        antenna, confirm_retries)
+        await call_select_antenna_api(antenna, (_MSG_ANTENNA_RESPONSE, (0, '')), msgq)
+    else:
+        confirm_failures += 1
+        logging.error('antenna %d was not confirmed after %d retries', 'main:on_confirm_timeout',
+                      antenna, confirm_retries)
+        end_confirmation(False)
+        #                                     '12345678901234567890'
+        update_ui_page(_RADIO_DATA_PAGE, None, '*Not Confirmed*')
 
-                    await update_ui_page(_RADIO_DATA_PAGE, None, display_antenna_name)
-
-                    if not radio_power:
-                        errmsg = f'{radio_name} No Power'
-                        # if logging.should_log(logging.DEBUG):  # doesn't matter
-                        logging.debug(errmsg, 'main:msg_loop:NoPower')
-                        await update_ui_page(_RADIO_DATA_PAGE, errmsg, None)
-                        set_inhibit(1)
-                    else:
-                        if current_band_number < 1 or current_band_number > 13:
-                            # this does not look like a valid band choice, read the band data again.
-                            band_detector.invalidate()
-                        else:
-                            errmsg = f'{radio_name} {BANDS[current_band_number]}'
-                            await update_ui_page(_RADIO_DATA_PAGE, errmsg, None)
-                            if current_antenna < 1:
-                                set_inhibit(1)
-                            else:
-                                if MASKS[current_band_number] & antenna_bands[current_antenna - 1]:
-                                    set_inhibit(0)
-                                    if len(band_antennae) > 1:
-                                        display_antenna_name = f'{current_antenna_name} + {len(band_antennae) - 1}'
-                                    else:
-                                        display_antenna_name = current_antenna_name
-                                    await update_ui_page(_RADIO_DATA_PAGE, None, display_antenna_name)
-                                else:
-                                    set_inhibit(1)
-                                    # try to get the right band...
-                                    await new_band(current_band_number)
 
-                else:
-                    logging.warning(f'unexpected msg_switch_name {msg_switch_name}, want switch_name {switch_name}',
-                                    'main:msg_loop:_MSG_UDP_RESPONSE')
-            else:
-                logging.error(f'udp message is wrong length: {len(m1)}, expected 21.',
-                              'main:msg_loop:_MSG_UDP_RESPONSE')
-        elif m0 == _MSG_UDP_TIMEOUT:
-            switch_timeouts += 1
-            if logging.should_log(logging.DEBUG):
-                logging.debug(f'switch timeouts={switch_timeouts}', 'main:msg_loop:MSG_STATUS_RESPONSE')
-            if switch_timeouts == 1:
-                if switch_connected:
-                    logging.warning('switch_connected True to False transition',
-                                    'main:msg_loop:_MSG_UDP_RESPONSE:')
-                set_inhibit(1)
-                switch_connected = False
-                current_antenna = -1
-                current_antenna_name = 'No Antenna Switch!'
-                display_antenna_name = current_antenna_name
-                await update_ui_page(_RADIO_DATA_PAGE, None, display_antenna_name)
-        else:
-            logging.error(f'unhandled message ({m0}, {m1})', 'main:msg_loop')
-        dt = milliseconds() - t0
-        if dt > 100:
-            logging.warning(f'Message {m0} handling took {dt} ms.', 'main:msg_loop')
-        # elif logging.should_log(logging.DEBUG):
-        #     logging.debug(f'Message {m0} handling took {dt} ms.', 'main:msg_loop')
+async def msg_loop(q):
+    dispatch = dispatcher.dispatch
+    batch = []
+    while True:
+        # drain a few messages per wakeup.  kept small so a control message that arrives meanwhile waits
+        # for at most a few handlers.
+        for msg in await q.get_many(_MSG_BATCH_SIZE, batch):
+            # logging.debug('msg received: %s', 'main:msg_loop', msg)
+            await dispatch(msg)
 
 
 async def net_msg_func(message: str, msg_status=0) -> None:
-    if logging.should_log(logging.DEBUG):
-        logging.debug(f'network message: "{message.strip()}", {msg_status}', 'main:net_msg_func')
+    logging.debug('network message: "%s", %d', 'main:net_msg_func', message, msg_status)
     lines = message.split('\n')
     if len(lines) == 1:
-        await update_ui_page(_NETWORK_DATA_PAGE, message)
+        update_ui_page(_NETWORK_DATA_PAGE, message)
     else:
-        await update_ui_page(_NETWORK_DATA_PAGE, lines[0], lines[1])
+        update_ui_page(_NETWORK_DATA_PAGE, lines[0], lines[1])
     if msg_status == 1:
         await msgq.put((_MSG_NETWORK_UPDOWN, 1))
 
 
 async def put_timer_message(msg):
-    if logging.should_log(logging.INFO):
-        logging.info(f'put timer message: {msg}')
+    logging.info('put timer message: %s', 'main:put_timer_message', msg)
     await msgq.put(msg)
 
 
 async def main():
-    global ap_mode, keep_running, config, restart, radio_number, switch_host, switch_name
+    global ap_mode, keep_running, config, restart, switch_host, switch_name, \
+        receive_broadcasts, broadcast_receiver_task
     config['ap_mode'] = sw1.value() == 0
     config_level = config.get('log_level')
     if config_level:
         logging.set_level(config_level)
+    logging.set_console(config.get('log_console', True))
 
-    radio_number = config.get('radio_number', -1)
+    state.update(radio_number=config.get('radio_number', -1))
+    prefs = config.get('band_antenna_prefs')
+    if isinstance(prefs, list) and len(prefs) == len(band_prefs):
+        band_prefs[:] = [safe_int(pref, 0) for pref in prefs]
     auto_on = config.get('auto_on', False)
     switch_host = config.get('switch_ip', 'localhost').encode()
     switch_name = config.get('switch_name', 'switch-name')
+    inventory.set_switch_name(switch_name)
     ap_mode = config.get('ap_mode', False)
+    inputs.set_debounce(band_detector,
+                        safe_int(config.get('band_settle_ms'), _BAND_SETTLE_MS),
+                        safe_int(config.get('band_settle_samples'), _BAND_SETTLE_SAMPLES))
 
     web_port = safe_int(config.get('web_port') or DEFAULT_WEB_PORT, DEFAULT_WEB_PORT)
     if web_port < 1 or web_port > 65535:
@@ -803,15 +1130,11 @@ async def main():
         picow_network = None
         _msg_loop_task = None
 
-    logging.info(f'Starting web service on port {web_port}', 'main:main')
+    logging.info('Starting web service on port %d', 'main:main', web_port)
     _web_server_task = asyncio.create_task(asyncio.start_server(http_server.serve_http_client, '0.0.0.0', web_port))
 
-    receive_broadcasts = None
-    broadcast_receiver_task = None
-
     auto_power_timer = 5 if auto_on else 0
     ten_count = 0
-    sleep_ms = asyncio.sleep_ms
     while keep_running:
         await sleep_ms(100)  # asyncio.sleep(1.0)
         ten_count += 1
@@ -832,21 +1155,33 @@ async def main():
                     netmask = picow_network.get_netmask()
                     broadcast_address = calculate_broadcast_address(ip_address, netmask)
                     receive_broadcasts = ReceiveBroadcasts(receive_ip=broadcast_address,
-                                                           receive_port=65073,
+                                                           receive_port=STATUS_BROADCAST_PORT,
                                                            config=config,
                                                            message_queue=msgq,
-                                                           message_id=_MSG_UDP_RESPONSE)
+                                                           message_id=_MSG_UDP_RESPONSE,
+                                                           inventory=inventory,
+                                                           multicast_group=config.get('udp_multicast_group'),
+                                                           interface_ip=ip_address,
+                                                           link_stats=link_stats)
                     broadcast_receiver_task = asyncio.create_task(receive_broadcasts.wait_for_datagram())
 
+            if display.page == _LINK_DATA_PAGE:
+                update_link_page()
+
+            if recorder is not None:
+                recorder.flush()
+
             if auto_power_timer > 0:
                 auto_power_timer -= 1
                 if auto_power_timer == 0:
-                    if not radio_power:
+                    if not state.radio_power:
                         logging.info('Attempting to auto-power-on the radio...', 'main:main')
                         await power_on()
         blinky.toggle()
 
     config.flush()
+    if recorder is not None:
+        recorder.close()
 
     if upython:
         logging.warning('calling soft_reset', 'main:main')
@@ -856,10 +1191,10 @@ async def main():
 if __name__ == '__main__':
     reset_cause = machine.reset_cause()
     logging.loglevel = logging.INFO
-    logging.info(f'starting, reset_cause={reset_cause}', 'main:__main__')
-    logging.info(f'BandSelector version {__version__} running on {sys.implementation[2]}', 'main:__main__')
+    logging.info('starting, reset_cause=%d', 'main:__main__', reset_cause)
+    logging.info('BandSelector version %s running on %s', 'main:__main__', __version__, sys.implementation[2])
     machine.freq(200000000)  # overclock to 200 Mhz, is now supported, stock pico 2 is 150 MHz, pico is 133 MHz.
-    logging.info(f'clock set to {machine.freq()} hz')
+    logging.info('clock set to %d hz', 'main:__main__', machine.freq())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,99 @@
+#
+# message_dispatcher.py -- table-driven message dispatch with per-message-type timing.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+import micro_logging as logging
+from utils import microseconds, ticks_diff
+
+
+class HandlerStats:
+    """
+    cumulative handling time for one message type, in microseconds.
+    """
+    __slots__ = ('count', 'total_us', 'min_us', 'max_us')
+
+    def __init__(self):
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def add(self, dt_us: int) -> None:
+        if self.count == 0 or dt_us < self.min_us:
+            self.min_us = dt_us
+        if dt_us > self.max_us:
+            self.max_us = dt_us
+        self.count += 1
+        self.total_us += dt_us
+
+    def as_dict(self) -> dict:
+        return {'count': self.count,
+                'min_us': self.min_us,
+                'avg_us': self.total_us // self.count if self.count else 0,
+                'max_us': self.max_us,
+                }
+
+
+class MessageDispatcher:
+    """
+    maps message IDs to coroutine handlers.  handlers are called with the whole message tuple.
+    use the handler() decorator to register a handler, much like HttpServer.route().
+    """
+
+    def __init__(self, slow_ms=100):
+        self._handlers = {}
+        self._stats = {}
+        self._slow_us = slow_ms * 1000
+        self.unhandled = 0
+
+    def register(self, msg_id: int, handler) -> None:
+        self._handlers[msg_id] = handler
+        if msg_id not in self._stats:
+            self._stats[msg_id] = HandlerStats()
+
+    def handler(self, msg_id: int):
+        def decorator(func):
+            self.register(msg_id, func)
+            return func
+        return decorator
+
+    async def dispatch(self, msg) -> None:
+        m0 = msg[0]
+        handler = self._handlers.get(m0)
+        if handler is None:
+            self.unhandled += 1
+            logging.error('unhandled message %s', 'message_dispatcher:dispatch', msg)
+            return
+        t0 = microseconds()
+        await handler(msg)
+        dt = ticks_diff(microseconds(), t0)
+        self._stats[m0].add(dt)
+        if dt > self._slow_us:
+            logging.warning('Message %d handling took %d ms.', 'message_dispatcher:dispatch', m0, dt // 1000)
+
+    def stats(self) -> dict:
+        return {'handlers': {str(msg_id): stats.as_dict() for msg_id, stats in self._stats.items()},
+                'unhandled': self.unhandled,
+                }
@@ -0,0 +1,186 @@
+#
+# message_recorder.py -- records message queue traffic to a compact binary file, and reads it back.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.1'  # 2026-10-19
+
+
+from struct import pack, pack_into, unpack_from
+
+import micro_logging as logging
+from utils import milliseconds, ticks_diff, upython
+
+if not upython:
+    def const(i):
+        return i
+
+# the file starts with MAGIC.  each record is a header, _HEADER_FMT: ms since recording started, message id
+# and payload kind, then the payload, then the trace id if the kind has KIND_TRACED set.
+MAGIC = b'BSREC1\n'
+_HEADER_FMT = '<IHB'
+_HEADER_SIZE = const(7)
+
+KIND_NONE = const(0)  # payload could not be encoded, or was None
+KIND_INT = const(1)  # '<i'
+KIND_STR = const(2)  # '<H' length, utf-8 bytes
+KIND_BYTES = const(3)  # '<H' length, bytes
+KIND_STATUS = const(4)  # (http status, str or bytes): '<iB' status, KIND_STR or KIND_BYTES, then as above
+KIND_INVENTORY = const(5)  # AntennaInventory: '<H' length, the raw status datagram it was updated from
+KIND_TRACED = const(0x80)  # '<i' trace id (msg[2]) follows the payload
+
+_BUFFER_SIZE = const(2048)
+
+
+class MessageRecorder:
+    """
+    records every message put on a RingbufQueue.  set queue.tap = recorder.record to start recording.
+    record() only appends to a buffer, call flush() periodically to write the buffer to the file.
+    records are dropped (and counted) if the buffer is full or the file has reached max_bytes.
+    """
+    __slots__ = ('filename', 'records', 'dropped', '_file', '_buf', '_used', '_start_ms', '_max_bytes', '_written')
+
+    def __init__(self, filename, max_bytes=131072):
+        self.filename = filename
+        self.records = 0
+        self.dropped = 0
+        self._buf = bytearray(_BUFFER_SIZE)
+        self._used = 0
+        self._max_bytes = max_bytes
+        self._file = open(filename, 'wb')
+        self._file.write(MAGIC)
+        self._written = len(MAGIC)
+        self._start_ms = milliseconds()
+
+    def record(self, msg) -> None:
+        payload = msg[1]
+        if isinstance(payload, int):
+            kind = KIND_INT
+            body = pack('<i', payload)
+        elif isinstance(payload, str):
+            kind = KIND_STR
+            body = _pack_data(payload.encode())
+        elif isinstance(payload, (bytes, bytearray)):
+            kind = KIND_BYTES
+            body = _pack_data(payload)
+        elif isinstance(payload, tuple) and len(payload) == 2 and isinstance(payload[0], int):
+            data = payload[1]
+            if isinstance(data, str):
+                body = pack('<iB', payload[0], KIND_STR) + _pack_data(data.encode())
+            else:
+                body = pack('<iB', payload[0], KIND_BYTES) + _pack_data(bytes(data))
+            kind = KIND_STATUS
+        elif hasattr(payload, 'raw_datagram'):
+            kind = KIND_INVENTORY
+            body = _pack_data(payload.raw_datagram())
+        else:
+            kind = KIND_NONE
+            body = b''
+        if len(msg) > 2:
+            kind |= KIND_TRACED
+            body += pack('<i', msg[2])
+        size = _HEADER_SIZE + len(body)
+        used = self._used
+        if used + size > _BUFFER_SIZE or self._written + used + size > self._max_bytes:
+            self.dropped += 1
+            return
+        pack_into(_HEADER_FMT, self._buf, used, ticks_diff(milliseconds(), self._start_ms), msg[0], kind)
+        self._buf[used + _HEADER_SIZE:used + size] = body
+        self._used = used + size
+        self.records += 1
+
+    def flush(self) -> None:
+        used = self._used
+        if used == 0 or self._file is None:
+            return
+        try:
+            self._file.write(memoryview(self._buf)[:used])
+            self._file.flush()
+            self._written += used
+        except OSError as ose:
+            logging.exception('could not write recording', 'message_recorder:flush', ose)
+        self._used = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def as_dict(self) -> dict:
+        return {'filename': self.filename,
+                'recording': self._file is not None,
+                'records': self.records,
+                'dropped': self.dropped,
+                'bytes': self._written + self._used,
+                }
+
+
+def _pack_data(data) -> bytes:
+    if len(data) > 0xffff:
+        data = data[:0xffff]
+    return pack('<H', len(data)) + data
+
+
+def _unpack_data(buf, offset):
+    size = unpack_from('<H', buf, offset)[0]
+    offset += 2
+    return bytes(buf[offset:offset + size]), offset + size
+
+
+def read_records(filename):
+    """
+    read a recording.
+    :return: a generator of (ms since start, message id, kind, payload, trace id) tuples.  kind has
+             KIND_TRACED removed; the trace id is 0 if the message was not traced.  the payload of a
+             KIND_INVENTORY record is the raw status datagram.
+    """
+    with open(filename, 'rb') as f:
+        buf = f.read()
+    if not buf.startswith(MAGIC):
+        raise ValueError(f'{filename} is not a message recording')
+    offset = len(MAGIC)
+    end = len(buf)
+    while offset + _HEADER_SIZE <= end:
+        t_ms, msg_id, kind = unpack_from(_HEADER_FMT, buf, offset)
+        offset += _HEADER_SIZE
+        traced = kind & KIND_TRACED
+        kind &= ~KIND_TRACED
+        if kind == KIND_INT:
+            payload = unpack_from('<i', buf, offset)[0]
+            offset += 4
+        elif kind == KIND_STR:
+            data, offset = _unpack_data(buf, offset)
+            payload = data.decode()
+        elif kind == KIND_BYTES or kind == KIND_INVENTORY:
+            payload, offset = _unpack_data(buf, offset)
+        elif kind == KIND_STATUS:
+            status, data_kind = unpack_from('<iB', buf, offset)
+            data, offset = _unpack_data(buf, offset + 5)
+            payload = (status, data.decode() if data_kind == KIND_STR else data)
+        else:
+            payload = None
+        trace_id = 0
+        if traced:
+            trace_id = unpack_from('<i', buf, offset)[0]
+            offset += 4
+        yield t_ms, msg_id, kind, payload, trace_id
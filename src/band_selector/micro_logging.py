@@ -22,9 +22,12 @@ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
 OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
 OF THE POSSIBILITY OF SUCH DAMAGE.
 """
-__version__ = '0.1.2'  # 2026-04-27
+__version__ = '0.2.1'  # 2026-10-19
 
-from utils import get_timestamp, upython
+from array import array
+import time
+
+from utils import get_timestamp_from_secs, upython
 
 if not upython:
     def const(i):
@@ -36,11 +39,109 @@ WARNING = const(3)
 ERROR = const(2)
 CRITICAL = const(1)
 NOTHING = const(0)
-LEVEL_NAMES = ('NOTHING', 'CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG')
+LEVEL_NAMES = ('NOTHING', 'CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'EXCEPTION')
+_EXCEPTION = const(6)  # exceptions are always logged, this is only for the level recorded by the sinks.
+_LEVEL_TAGS = ('[NOTHING]  ', '[CRITICAL] ', '[ERROR]    ', '[WARNING]  ', '[INFO]     ', '[DEBUG]    ', '[EXCEPTION]')
 
 loglevel = ERROR
 
 
+class ConsoleSink:
+    """
+    prints log entries to the console, the USB serial port on the Pico-W.
+    """
+    @staticmethod
+    def write(secs: int, level: int, caller, message: str) -> None:
+        if caller is None:
+            print(get_timestamp_from_secs(secs), _LEVEL_TAGS[level], message)
+        else:
+            print(get_timestamp_from_secs(secs), ' ', _LEVEL_TAGS[level], ' [', caller, '] ', message, sep='')
+
+
+class RingBufferSink:
+    """
+    keeps the most recent log entries in RAM: the time, the level, the caller tag and the message.
+    entries are numbered from 1, so a reader can ask for the entries after the last one it has seen.
+    """
+    __slots__ = ('_size', '_secs', '_levels', '_callers', '_messages', 'seq')
+
+    def __init__(self, size=64):
+        self._size = size
+        self._secs = array('l', [0] * size)
+        self._levels = bytearray(size)
+        self._callers = [None] * size  # caller tags are string constants, this only keeps a reference.
+        self._messages = [''] * size
+        self.seq = 0  # number of the newest entry, 0 if none yet
+
+    def write(self, secs: int, level: int, caller, message: str) -> None:
+        i = self.seq % self._size
+        self._secs[i] = secs
+        self._levels[i] = level
+        self._callers[i] = caller
+        self._messages[i] = message
+        self.seq += 1
+
+    def entries(self, since: int = 0) -> dict:
+        """
+        :param since: the number of the last entry already seen, 0 for all of them.  a number after the newest
+                      entry means the log was restarted, so all the entries are returned.
+        :return: the entries after since, oldest first, the newest entry number, the number of entries
+                 after since that were already overwritten, and whether the log was reset since.
+        """
+        seq = self.seq
+        reset = since > seq
+        if reset:
+            since = 0
+        first = since + 1
+        oldest = seq - self._size + 1
+        if first < oldest:
+            first = oldest
+        if first < 1:
+            first = 1
+        entries = []
+        for n in range(first, seq + 1):
+            i = (n - 1) % self._size
+            entries.append({'seq': n,
+                            'time': get_timestamp_from_secs(self._secs[i]),
+                            'level': LEVEL_NAMES[self._levels[i]],
+                            'caller': self._callers[i],
+                            'message': self._messages[i],
+                            })
+        return {'seq': seq,
+                'missed': first - since - 1 if 0 <= since < first - 1 else 0,
+                'reset': reset,
+                'entries': entries,
+                }
+
+
+ring = RingBufferSink()
+console = ConsoleSink()
+_sinks = [ring, console]
+
+
+def add_sink(sink) -> None:
+    """
+    add a log sink, an object with a write(secs, level, caller, message) method.
+    """
+    if sink not in _sinks:
+        _sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def set_console(enabled: bool) -> None:
+    """
+    turn printing log entries on the console on or off.  the RAM ring buffer always has them.
+    """
+    if enabled:
+        add_sink(console)
+    else:
+        remove_sink(console)
+
+
 def set_level(level):
     global loglevel
     if isinstance(level, str):
@@ -53,53 +154,55 @@ def set_level(level):
     if isinstance(level, int):
         if NOTHING <= level <= DEBUG:
             if loglevel >= INFO or level >= INFO:
-                _log('[INFO]     ', f'setting log level to {LEVEL_NAMES[level]}', 'micro_logging:set_level')
+                _log(INFO, 'setting log level to %s', 'micro_logging:set_level', (LEVEL_NAMES[level],))
             loglevel = level
 
 
-# this is used to determine if logging.level() methods should be called,
-# purpose is to reduce heap pollution from building complex log messages.
+# the logging methods take a %-style format string and its arguments after the caller, like
+#   logging.info('new band: %s', 'main:new_band', band_name)
+# the message is only formatted if the level is enabled, so there is no need to build it up front.
+# should_log() is for messages that need more work than formatting.
 def should_log(level):
     return level <= loglevel
 
 
-def _log(level: str, message: str|bytes, caller=None):
+def _log(level: int, message: str|bytes, caller=None, args=None):
+    if args:
+        message = message % args
     if isinstance(message, bytes):
         message = message.decode()
-    if caller is None:
-        print(get_timestamp(), level, message)
-    else:
-        print(get_timestamp(), ' ', level, ' [', caller, '] ', message, sep='')
+    secs = int(time.time())
+    for sink in _sinks:
+        sink.write(secs, level, caller, message)
 
 
-def debug(message, caller=None):
+def debug(message, caller=None, *args):
     if loglevel >= DEBUG:
-        _log('[DEBUG]    ', message, caller)
+        _log(DEBUG, message, caller, args)
 
 
-def info(message, caller=None):
+def info(message, caller=None, *args):
     if loglevel >= INFO:
-        _log('[INFO]     ', message, caller)
+        _log(INFO, message, caller, args)
 
 
-def warning(message, caller=None):
+def warning(message, caller=None, *args):
     if loglevel >= WARNING:
-        _log('[WARNING]  ', message, caller)
+        _log(WARNING, message, caller, args)
 
 
-def error(message, caller=None):
+def error(message, caller=None, *args):
     if loglevel >= ERROR:
-        _log('[ERROR]    ', message, caller)
+        _log(ERROR, message, caller, args)
 
 
 def exception(message:str, caller:str = None, exc_info:Exception = None) -> None:
     if exc_info is not None:
-        _log('[EXCEPTION]', f'{message} {type(exc_info)} {exc_info}', caller)
+        _log(_EXCEPTION, f'{message} {type(exc_info)} {exc_info}', caller)
     else:
-        _log('[EXCEPTION]', message, caller)
+        _log(_EXCEPTION, message, caller)
 
 
-def critical(message, caller=None):
+def critical(message, caller=None, *args):
     if loglevel >= CRITICAL:
-        _log('[CRITICAL] ', message, caller)
-
+        _log(CRITICAL, message, caller, args)
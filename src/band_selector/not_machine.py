@@ -4,7 +4,7 @@
 
 __author__ = 'J. B. Otterson'
 __copyright__ = 'Copyright 2024, 2026,  J. B. Otterson N1KDO.'
-__version__ = '0.0.2'  # 2026-04-28
+__version__ = '0.0.4'  # 2026-10-19
 
 #
 # Copyright 2024 J. B. Otterson N1KDO.
@@ -57,28 +57,62 @@ class Machine(object):
         return b'\x00\x00\x00\x00\x00\x00'
 
     class Pin(object):
+        """
+        fake Pin.  pin values are kept per pin name, so every Pin made for the same pin sees the same value,
+        like the real hardware.  a simulation can drive input pins with Pin(name).value(v).
+        changing a pin's value calls the handler set with irq(), if the edge matches its trigger.
+        """
         OUT = 1
         IN = 0
-        PULL_UP = 0
-
-        def __init__(self, name, options=0, value=0):
-            self.pin_value = value
+        PULL_UP = 1
+        IRQ_FALLING = 4
+        IRQ_RISING = 8
+        _values = {}
+        _irqs = {}  # pin name: (handler, trigger, pin)
+
+        def __init__(self, name, mode=-1, pull=-1, value=None):
+            if isinstance(name, Machine.Pin):  # re-initializing an existing pin
+                name = name.name
             self.name = name
-            self.options = options
+            self.mode = mode
+            self.pull = pull
+            if value is not None:
+                Machine.Pin._values[name] = 1 if value else 0
+            elif name not in Machine.Pin._values:
+                Machine.Pin._values[name] = 1 if pull == Machine.Pin.PULL_UP else 0
+
+        @property
+        def pin_value(self) -> int:
+            return Machine.Pin._values[self.name]
+
+        def _set(self, new_value):
+            old_value = Machine.Pin._values[self.name]
+            Machine.Pin._values[self.name] = new_value
+            irq = Machine.Pin._irqs.get(self.name)
+            if irq is not None and new_value != old_value:
+                handler, trigger, pin = irq
+                if trigger & (Machine.Pin.IRQ_RISING if new_value else Machine.Pin.IRQ_FALLING):
+                    handler(pin)
 
         def on(self):
-            self.pin_value = 1
+            self._set(1)
 
         def off(self):
-            self.pin_value = 0
+            self._set(0)
 
         def toggle(self):
-            self.pin_value ^= 1
+            self._set(Machine.Pin._values[self.name] ^ 1)
 
         def value(self, new_value=None) -> int:
             if new_value is not None:
-                self.pin_value = 1 if new_value else 0
-            return self.pin_value
+                self._set(1 if new_value else 0)
+            return Machine.Pin._values[self.name]
+
+        def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+            if handler is None:
+                Machine.Pin._irqs.pop(self.name, None)
+            else:
+                Machine.Pin._irqs[self.name] = (handler, trigger, self)
 
     class I2C(object):
         def __init__(self, id, sda, scl):
@@ -8,59 +8,151 @@
 # Asynchronous iterator allowing consumer to use async for
 # put_nowait QueueFull exception can be ignored allowing oldest data to be discarded.
 
+# N1KDO: added priority lanes.  Each lane is a separate ring buffer; get() always returns the
+# oldest item from the highest priority (lowest numbered) lane that is not empty.  The lane for
+# an item is passed to put(), or computed by lane_func(item).  A full lane only blocks its own producers.
+# N1KDO: added coalescing.  When key_func(item) returns a key other than None, put() replaces an unconsumed
+# item with the same key in place rather than appending, so only the latest state update is queued.
+# put() never waits for space when the item will replace a queued item; put_nowait() does the replacing.
+# N1KDO: added get_many() to drain several items per await, and counters for sizing the queue: stats().
+# N1KDO: added tap, a function called with every item put on the queue, for recording.
+
 import asyncio
 
+from utils import milliseconds, ticks_diff
 
-class RingbufQueue:  # MicroPython optimised
-    __slots__ = ('_q', '_size', '_wi', '_ri', '_evput', '_evget')
 
-    def __init__(self, buf):
-        self._q = [0] * buf if isinstance(buf, int) else buf
-        self._size = len(self._q)
-        self._wi = 0
-        self._ri = 0
+class RingbufQueue:  # MicroPython optimised
+    __slots__ = ('_q', '_size', '_wi', '_ri', '_lanes', '_lane_func', '_key_func', '_depth', 'high_water', 'puts',
+                 'gets', 'drops', 'coalesced', 'blocked_puts', 'blocked_ms', 'tap', '_evput', '_evget')
+
+    def __init__(self, buf, lanes=1, lane_func=None, key_func=None):
+        if isinstance(buf, int):
+            self._q = [[0] * buf for _ in range(lanes)]
+        elif lanes == 1:
+            self._q = [buf]
+        else:
+            raise ValueError('buf must be a size when using lanes')
+        self._size = len(self._q[0])
+        self._wi = [0] * lanes
+        self._ri = [0] * lanes
+        self._lanes = lanes
+        self._lane_func = lane_func
+        self._key_func = key_func
+        self._depth = 0  # items in all lanes
+        self.high_water = 0  # most items ever queued at once
+        self.puts = 0
+        self.gets = 0
+        self.drops = 0  # oldest items discarded because a lane was full
+        self.coalesced = 0  # count of items replaced in place by a newer item with the same key
+        self.blocked_puts = 0  # put() calls that had to wait for a full lane
+        self.blocked_ms = 0  # total time put() calls waited
+        self.tap = None  # called with every item put, before it is queued
         self._evput = asyncio.Event()  # Triggered by put, tested by get
         self._evget = asyncio.Event()  # Triggered by get, tested by put
 
-    def full(self):
-        return ((self._wi + 1) % self._size) == self._ri
+    def _lane(self, v):
+        return 0 if self._lane_func is None else self._lane_func(v)
+
+    def _first_lane(self):  # Highest priority lane that is not empty, or -1
+        ri = self._ri
+        wi = self._wi
+        for lane in range(self._lanes):
+            if ri[lane] != wi[lane]:
+                return lane
+        return -1
+
+    def _find(self, v, lane):  # Index of a queued item with the same key, or -1
+        key_func = self._key_func
+        if key_func is None:
+            return -1
+        key = key_func(v)
+        if key is None:
+            return -1
+        q = self._q[lane]
+        size = self._size
+        i = self._ri[lane]
+        wi = self._wi[lane]
+        while i != wi:
+            if key_func(q[i]) == key:
+                return i
+            i = (i + 1) % size
+        return -1
+
+    def _pop(self, lane):
+        ri = self._ri[lane]
+        r = self._q[lane][ri]
+        self._ri[lane] = (ri + 1) % self._size
+        self._depth -= 1
+        self.gets += 1
+        self._evget.set()  # Schedule all tasks waiting on ._evget
+        self._evget.clear()
+        return r
+
+    def full(self, lane=0):
+        return ((self._wi[lane] + 1) % self._size) == self._ri[lane]
 
     def empty(self):
-        return self._ri == self._wi
+        return self._first_lane() < 0
 
-    def qsize(self):
-        return (self._wi - self._ri) % self._size
+    def qsize(self, lane=None):
+        if lane is not None:
+            return (self._wi[lane] - self._ri[lane]) % self._size
+        return sum((self._wi[n] - self._ri[n]) % self._size for n in range(self._lanes))
 
     def get_nowait(self):  # Remove and return an item from the queue.
         # Return an item if one is immediately available, else raise QueueEmpty.
-        if self.empty():
+        lane = self._first_lane()
+        if lane < 0:
             raise IndexError
-        r = self._q[self._ri]
-        self._ri = (self._ri + 1) % self._size
-        self._evget.set()  # Schedule all tasks waiting on ._evget
-        self._evget.clear()
-        return r
+        return self._pop(lane)
 
     def peek(self):  # Return oldest item from the queue without removing it.
         # Return an item if one is immediately available, else raise QueueEmpty.
-        if self.empty():
+        lane = self._first_lane()
+        if lane < 0:
             raise IndexError
-        return self._q[self._ri]
-
-    def put_nowait(self, v):
-        self._q[self._wi] = v
+        return self._q[lane][self._ri[lane]]
+
+    def put_nowait(self, v, lane=None):
+        if lane is None:
+            lane = self._lane(v)
+        self.puts += 1
+        if self.tap is not None:
+            self.tap(v)
+        i = self._find(v, lane)
+        if i >= 0:
+            self._q[lane][i] = v  # Consumer was already signalled when the original item was put
+            self.coalesced += 1
+            return
+        wi = self._wi[lane]
+        self._q[lane][wi] = v
         self._evput.set()  # Schedule any tasks waiting on get
         self._evput.clear()
-        self._wi = (self._wi + 1) % self._size
-        if self._wi == self._ri:  # Would indicate empty
-            self._ri = (self._ri + 1) % self._size  # Discard a message
+        wi = (wi + 1) % self._size
+        self._wi[lane] = wi
+        if wi != self._ri[lane]:
+            depth = self._depth + 1
+            self._depth = depth
+            if depth > self.high_water:
+                self.high_water = depth
+        else:  # Would indicate empty
+            self._ri[lane] = (wi + 1) % self._size  # Discard a message
+            self.drops += 1
             raise IndexError  # Caller can ignore if overwrites are OK
 
-    async def put(self, val):  # Usage: await queue.put(item)
-        while self.full():  # Queue full
-            await self._evget.wait()  # May be >1 task waiting on ._evget
-            # Task(s) waiting to get from queue, schedule first Task
-        self.put_nowait(val)
+    async def put(self, val, lane=None):  # Usage: await queue.put(item)
+        if lane is None:
+            lane = self._lane(val)
+        # An item that will replace a queued item never blocks, even if the lane is full.
+        if self.full(lane) and self._find(val, lane) < 0:
+            t0 = milliseconds()
+            while self.full(lane) and self._find(val, lane) < 0:  # Lane full
+                await self._evget.wait()  # May be >1 task waiting on ._evget
+                # Task(s) waiting to get from queue, schedule first Task
+            self.blocked_puts += 1
+            self.blocked_ms += ticks_diff(milliseconds(), t0)
+        self.put_nowait(val, lane)
 
     def __aiter__(self):
         return self
@@ -69,10 +161,34 @@ class RingbufQueue:  # MicroPython optimised
         return await self.get()
 
     async def get(self):
-        while self.empty():  # Empty. May be more than one task waiting on ._evput
+        while True:
+            lane = self._first_lane()
+            if lane >= 0:
+                return self._pop(lane)
+            await self._evput.wait()  # Empty. May be more than one task waiting on ._evput
+
+    async def get_many(self, max_items, into=None):
+        # Wait for at least one item, then return up to max_items, highest priority lane first.
+        # Pass a list as into to reuse it rather than allocating a new list for each batch.
+        while self._depth == 0:
             await self._evput.wait()
-        r = self._q[self._ri]
-        self._ri = (self._ri + 1) % self._size
-        self._evget.set()  # Schedule all tasks waiting on ._evget
-        self._evget.clear()
-        return r
+        items = [] if into is None else into
+        del items[:]
+        while len(items) < max_items:
+            lane = self._first_lane()
+            if lane < 0:
+                break
+            items.append(self._pop(lane))
+        return items
+
+    def stats(self):
+        return {'depth': self._depth,
+                'high_water': self.high_water,
+                'size': (self._size - 1) * self._lanes,
+                'puts': self.puts,
+                'gets': self.gets,
+                'drops': self.drops,
+                'coalesced': self.coalesced,
+                'blocked_puts': self.blocked_puts,
+                'blocked_ms': self.blocked_ms,
+                }
@@ -0,0 +1,96 @@
+#
+# selector_state.py -- the band selector's runtime state, with change notification.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+
+import asyncio
+
+
+class SelectorState:
+    """
+    the band selector's runtime state, shared by the message handlers, the display and the web API.
+    read the attributes directly, but change them only with update(), which increments version and
+    wakes the tasks in wait_for_change() when anything actually changed.
+    """
+    __slots__ = ('band_number', 'radio_number', 'radio_name', 'radio_power', 'antenna', 'antenna_name',
+                 'antenna_list_index', 'switch_connected', 'switch_timeouts', 'network_connected', 'inhibit',
+                 'lcd_lines', 'ui_page', 'version', '_changed')
+
+    def __init__(self):
+        self.band_number = 0
+        self.radio_number = 0
+        self.radio_name = 'Unknown Rig'
+        self.radio_power = False
+        self.antenna = -1  # antenna selected for our radio, 1-8, 0 if disconnected, -1 if unknown
+        self.antenna_name = 'Unknown Antenna'
+        self.antenna_list_index = 0  # index into the band's candidate antennas
+        self.switch_connected = False
+        self.switch_timeouts = 0
+        self.network_connected = False
+        self.inhibit = 0
+        self.lcd_lines = ('', '')
+        self.ui_page = 0
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    def update(self, **changes) -> bool:
+        """
+        set one or more attributes.
+        :return: True if anything changed.
+        """
+        changed = False
+        for name, value in changes.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed = True
+        if changed:
+            self.version += 1
+            self._changed.set()  # wake all tasks waiting in wait_for_change()
+            self._changed.clear()
+        return changed
+
+    async def wait_for_change(self, since_version: int) -> int:
+        """
+        wait until the state version is different from since_version.
+        :return: the new version.
+        """
+        while self.version == since_version:
+            await self._changed.wait()
+        return self.version
+
+    def as_dict(self) -> dict:
+        return {'version': self.version,
+                'band_number': self.band_number,
+                'radio_number': self.radio_number,
+                'radio_name': self.radio_name,
+                'radio_power': self.radio_power,
+                'antenna': self.antenna,
+                'antenna_name': self.antenna_name,
+                'switch_connected': self.switch_connected,
+                'switch_timeouts': self.switch_timeouts,
+                'network_connected': self.network_connected,
+                'inhibit': self.inhibit,
+                'lcd_lines': list(self.lcd_lines),
+                }
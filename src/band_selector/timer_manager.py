@@ -19,57 +19,102 @@ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
 OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
 OF THE POSSIBILITY OF SUCH DAMAGE.
 """
-__version__ = '0.0.2'  # 2026-04-28
+__version__ = '0.1.1'  # 2026-10-19
 
 
-from asyncio import create_task, sleep_ms
-import micropython
+
+import asyncio
+from asyncio import create_task
+from heapq import heappop, heappush
+from histogram import Histogram
 import micro_logging as logging
+from utils import milliseconds, ticks_diff, upython
 
-# taken from https://github.com/micropython/micropython-lib/python-stdlib/inspect/inspect.py
-_g = lambda: (yield)
-def iscoroutinefunction(obj):
-    return isinstance(obj, type(_g))
+if upython:
+    # taken from https://github.com/micropython/micropython-lib/python-stdlib/inspect/inspect.py
+    _g = lambda: (yield)
+    def iscoroutinefunction(obj):
+        return isinstance(obj, type(_g))
+else:
+    from inspect import iscoroutinefunction
 
 class Timer:
     """
     Timer class contains information about Timer events.
     """
+    __slots__ = ('index', 'delay_ms', 'deadline', 'generation', 'auto_reset', 'callback', 'argument', 'coroutine',
+                 'lateness')
     indexCounter = -1
 
-    def __init__(self, delay:float, callback, arg=None, auto_reset:bool=False)->None:
+    def __init__(self, delay:float, callback, arg=None, auto_reset:bool=False, lateness=None)->None:
         Timer.indexCounter += 1
         self.index = Timer.indexCounter
-        self.delay = int(delay*10)
-        self.remaining = self.delay
+        self.delay_ms = int(delay * 1000)
+        self.deadline = 0  # TimerManager clock ms when the timer expires
+        self.generation = 0  # incremented when the timer is reset, to invalidate its old heap entry
         self.auto_reset = auto_reset
         self.callback = callback
         self.argument = arg
         self.coroutine = iscoroutinefunction(callback)
+        self.lateness = lateness  # Histogram of ms between deadline and firing, shared by timers with the same name
 
 
 class TimerManager:
     """
     TimerManager provides one-shot or periodic timer function callbacks.
-    Note that resolution is "about" 100 milliseconds.
+    Timers are kept in a heap ordered by deadline, and the timer task sleeps until the next deadline, so
+    resolution is about 1 millisecond and there are no wakeups when no timer is due.
+    Adding or resetting a timer is O(log n), cancelling is O(1): stale heap entries are skipped when popped.
+    Coroutine callbacks run as their own tasks, at most max_running at once, so a slow callback does not delay
+    other timers.  Exceptions raised by callbacks are logged and counted.
     """
 
-    def __init__(self):
+    def __init__(self, max_running=4):
         self._timers = {}
+        self._lateness = {}  # timer name -> Histogram
+        self._max_running = max_running
+        self._running = 0
+        self._slot_free = asyncio.Event()
+        self.errors = 0  # callbacks that raised an exception
+        self.deferred = 0  # times the timer task waited because max_running callbacks were running
+        self._heap = []  # (deadline, generation, index)
         self._run = True
+        self._wake = asyncio.Event()
+        self._clock_ms = 0
+        self._last_ticks = milliseconds()
         create_task(self._check_timers())
 
-    def add_timer(self, delay, callback, arg, auto_reset=False)->int:
+    def _now(self) -> int:
+        # a millisecond clock that does not wrap, unlike ticks_ms().
+        ticks = milliseconds()
+        self._clock_ms += ticks_diff(ticks, self._last_ticks)
+        self._last_ticks = ticks
+        return self._clock_ms
+
+    def _schedule(self, timer:Timer, deadline:int)->None:
+        timer.deadline = deadline
+        heap = self._heap
+        if not heap or deadline < heap[0][0]:
+            self._wake.set()  # the timer task must recalculate its sleep
+        heappush(heap, (deadline, timer.generation, timer.index))
+
+    def add_timer(self, delay, callback, arg, auto_reset=False, name='timer')->int:
         """
         Adds a new timer .
-        :param delay: how long to delay the timer.
+        :param delay: how long to delay the timer, in seconds.
         :param callback:  function to execute when timer expires
         :param arg: argument to pass to callback
         :param auto_reset: set True to cause timer to repeat
+        :param name: timers with the same name share a firing lateness histogram
         :return: the timer index, used to cancel or reset the timer.
         """
-        timer = Timer(delay, callback, arg, auto_reset)
+        lateness = self._lateness.get(name)
+        if lateness is None:
+            lateness = Histogram((1, 2, 5, 10, 20, 50, 100))
+            self._lateness[name] = lateness
+        timer = Timer(delay, callback, arg, auto_reset, lateness)
         self._timers[timer.index] = timer
+        self._schedule(timer, self._now() + timer.delay_ms)
         #logging.info(f'added timer {timer.index} for {delay} sec...', 'timer_manager:add_timer')
         return timer.index
 
@@ -92,7 +137,27 @@ class TimerManager:
         #logging.info(f'timer {index} reset...', 'timer_manager:reset_timer')
         timer = self._timers.get(index)
         if timer is not None:
-            timer.remaining = timer.delay
+            timer.generation += 1
+            self._schedule(timer, self._now() + timer.delay_ms)
+
+    def stats(self) -> dict:
+        return {'timers': len(self._timers),
+                'running': self._running,
+                'errors': self.errors,
+                'deferred': self.deferred,
+                'lateness_ms': {name: lateness.as_dict() for name, lateness in self._lateness.items()},
+                }
+
+    async def _run_callback(self, timer:Timer)->None:
+        try:
+            await timer.callback(timer.argument)
+        except Exception as e:
+            self.errors += 1
+            logging.exception('timer callback raised', 'timer_manager:_run_callback', e)
+        finally:
+            self._running -= 1
+            self._slot_free.set()
+            self._slot_free.clear()
 
     def stop(self) -> None:
         """
@@ -100,27 +165,48 @@ class TimerManager:
         :return: None
         """
         self._run = False
+        self._wake.set()
 
-    @micropython.native
     async def _check_timers(self):
+        heap = self._heap
+        timers = self._timers
+        wake = self._wake
         while self._run:
-            delete_list = []
-            for timer in self._timers.values():
-                timer.remaining -= 1
-                if timer.remaining == 0:
-                    #logging.info(f'timer {timer.index} timed out...', 'timer_manager:_check_timers')
+            wake.clear()
+            now = self._now()
+            while heap and heap[0][0] <= now:
+                deadline, generation, index = heappop(heap)
+                timer = timers.get(index)
+                if timer is None or timer.generation != generation:
+                    continue  # cancelled or reset since this entry was pushed
+                if timer.auto_reset:
+                    next_deadline = deadline + timer.delay_ms
+                    self._schedule(timer, next_deadline if next_deadline > now else now + timer.delay_ms)
+                else:
+                    del timers[index]
+                #logging.info(f'timer {timer.index} timed out...', 'timer_manager:_check_timers')
+                timer.lateness.add(now - deadline)
+                if timer.coroutine:
+                    if self._running >= self._max_running:
+                        self.deferred += 1
+                        while self._running >= self._max_running:
+                            await self._slot_free.wait()
+                    self._running += 1
+                    create_task(self._run_callback(timer))
+                else:
                     try:
-                        if timer.coroutine:
-                            await timer.callback(timer.argument)
-                        else:
-                            timer.callback(timer.argument)
+                        timer.callback(timer.argument)
                     except Exception as e:
+                        self.errors += 1
                         logging.exception('timer callback raised', 'timer_manager:_check_timers', e)
-                        raise e 
-                    if timer.auto_reset:
-                        timer.remaining = timer.delay
-                    else:
-                        delete_list.append(timer.index)
-            for index in delete_list:
-                del self._timers[index]
-            await sleep_ms(100)
+                now = self._now()
+            if not self._run:
+                break
+            wake.clear()
+            if heap:
+                try:
+                    await asyncio.wait_for(wake.wait(), (heap[0][0] - now) / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await wake.wait()
@@ -33,10 +33,21 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
-__version__ = '0.1.1'
+__version__ = '0.1.2'
 
 import asyncio
 
+
+async def _close(reader, writer):
+    # micropython: reader and writer are the same stream, and wait_closed() closes it; close() does nothing.
+    # see https://github.com/micropython/micropython/blob/master/extmod/asyncio/stream.py#L16
+    # cpython: the writer must be closed before wait_closed() returns, and the reader has no wait_closed().
+    writer.close()
+    await writer.wait_closed()
+    if hasattr(reader, 'wait_closed'):
+        await reader.wait_closed()
+
+
 class ClientResponse:
     def __init__(self, reader, writer):
         self.reader = reader
@@ -46,10 +57,7 @@ class ClientResponse:
 
     async def read(self, sz:int=-1) -> bytes:
         data = await self.reader.read(sz)
-        # self.writer.close()  # does nothing
-        await self.writer.wait_closed()
-        # self.reader.close()  # does nothing
-        await self.reader.wait_closed()
+        await _close(self.reader, self.writer)
         return data
 
     def __repr__(self) -> str:
@@ -72,21 +80,14 @@ class ChunkedClientResponse(ClientResponse):
                 # End of message
                 sep = await self.reader.read(2)
                 assert sep == b'\r\n'
-                # self.writer.close()  # does nothing in micropython
-                await self.writer.wait_closed()
-                # self.reader.close()
-                await self.reader.wait_closed()
+                await _close(self.reader, self.writer)
                 return b''
         data = await self.reader.read(min(sz, self.chunk_size))
         self.chunk_size -= len(data)
         if self.chunk_size == 0:
             sep = await self.reader.read(2)
             assert sep == b'\r\n'
-        # self.writer.close()  # does nothing!
-        # see https://github.com/micropython/micropython/blob/master/extmod/asyncio/stream.py#L16
-        await self.writer.wait_closed()
-        # self.reader.close()  # does nothing
-        await self.reader.wait_closed()
+        await _close(self.reader, self.writer)
         return data
 
     def __repr__(self) -> str:
@@ -144,9 +145,7 @@ async def request(method:bytes, url:bytes):
 
         if 301 <= status <= 303:
             redir_cnt += 1
-            # aclose() is aliased to wait_closed()
-            await reader.wait_closed()
-            await writer.wait_closed()
+            await _close(reader, writer)
             continue
         break
 
@@ -19,17 +19,15 @@ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
 OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
 OF THE POSSIBILITY OF SUCH DAMAGE.
 """
-__version__ = '0.0.3'  # 2026-05-20
+__version__ = '0.0.8'  # 2026-10-19
 
+from array import array
 from ringbuf_queue import RingbufQueue
-from utils import upython
+from utils import micropython, milliseconds, sleep_ms, ticks_diff, upython
 import asyncio
-if upython:
-    import micro_logging as logging
-else:
-    import logging
+import micro_logging as logging
 import socket
-from struct import calcsize, pack_into, unpack
+from struct import calcsize, pack_into
 
 '''
         payload = {'radio_1_antenna': antennas_selected[0],  # is int (0->8), could be uint8
@@ -52,6 +50,36 @@ ANTENNA_NAMES_SIZE = 8
 ANTENNA_BANDS_OFFSET = 12
 ANTENNA_BANDS_SIZE = 8
 SWITCH_NAME_OFFSET = 20
+# byte position and size of the switch name field in the raw datagram
+SWITCH_NAME_SIZE = 64
+SWITCH_NAME_POS = STATUS_BROADCAST_SIZE - SWITCH_NAME_SIZE
+
+STATUS_BROADCAST_PORT = 65073
+STATUS_BROADCAST_PERIOD_MS = 1000
+# the receiver polls its socket this often.  a datagram's arrival time is when it is read, so this is also the
+# resolution of the link stats intervals and jitter.
+RECEIVE_POLL_MS = 10
+DEFAULT_MULTICAST_TTL = 4
+
+# socket option numbers are not always exported by micropython's socket module.
+_IPPROTO_IP = getattr(socket, 'IPPROTO_IP', 0)
+_IP_ADD_MEMBERSHIP = getattr(socket, 'IP_ADD_MEMBERSHIP', 0x400 if upython else 35)
+_IP_MULTICAST_TTL = getattr(socket, 'IP_MULTICAST_TTL', 5 if upython else 33)
+_IP_MULTICAST_IF = getattr(socket, 'IP_MULTICAST_IF', 6 if upython else 32)
+
+
+def inet_aton(ip_address):
+    # convert dotted-quad ip_address to 4 bytes in network order
+    return bytes([int(x) for x in ip_address.split('.')])
+
+
+def is_multicast_address(ip_address):
+    # IPv4 multicast addresses are 224.0.0.0 through 239.255.255.255
+    try:
+        octets = [int(x) for x in ip_address.split('.')]
+    except (AttributeError, ValueError):
+        return False
+    return len(octets) == 4 and 224 <= octets[0] <= 239 and all(0 <= x <= 255 for x in octets)
 
 
 def calculate_broadcast_address(ip_address, netmask):
@@ -72,17 +100,39 @@ def calculate_broadcast_address(ip_address, netmask):
 class SendBroadcasts:
     """
     class to send UDP status datagrams
+    if target_ip is a multicast group address, datagrams are sent to that group with multicast_ttl,
+    so they can be routed.  if the multicast socket cannot be set up, fallback_ip (normally the
+    subnet broadcast address) is used instead.  interface_ip selects the outgoing interface for multicast.
     """
 
-    def __init__(self, target_ip, target_port, config: dict, antennas_selected:[]):
+    def __init__(self, target_ip, target_port, config: dict, antennas_selected:[],
+                 multicast_ttl=DEFAULT_MULTICAST_TTL, fallback_ip=None, interface_ip=None):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if is_multicast_address(target_ip):
+            try:
+                self.socket.setsockopt(_IPPROTO_IP, _IP_MULTICAST_TTL, multicast_ttl)
+                logging.info('Multicast TTL is %d', 'udp_messages:SendBroadcasts()', multicast_ttl)
+            except OSError as exc:
+                if fallback_ip is not None:
+                    logging.warning('cannot set multicast TTL: %s, falling back to %s', 'udp_messages:SendBroadcasts()',
+                                    exc, fallback_ip)
+                    target_ip = fallback_ip
+                else:
+                    logging.warning('cannot set multicast TTL: %s, using default TTL', 'udp_messages:SendBroadcasts()',
+                                    exc)
+            if interface_ip is not None and target_ip != fallback_ip:
+                try:
+                    self.socket.setsockopt(_IPPROTO_IP, _IP_MULTICAST_IF, inet_aton(interface_ip))
+                except OSError as exc:
+                    logging.warning('cannot set multicast interface %s: %s', 'udp_messages:SendBroadcasts()',
+                                    interface_ip, exc)
         self.sockaddr = socket.getaddrinfo(target_ip, target_port)[0][-1]
         self.config = config
         self.antennas_selected = antennas_selected
         self.buf = bytearray(STATUS_BROADCAST_SIZE)
-        logging.info(f'Broadcast address is {target_ip}:{target_port}', 'udp_messages:SendBroadcasts()')
-        logging.info(f'Starting status broadcasts', 'udp_messages:SendBroadcasts()')
+        logging.info('Broadcast address is %s:%s', 'udp_messages:SendBroadcasts()', target_ip, target_port)
+        logging.info('Starting status broadcasts', 'udp_messages:SendBroadcasts()')
         self.run = True
 
     def send(self, payload):
@@ -126,52 +176,211 @@ class SendBroadcasts:
         self.run = False
 
 
+# LinkStats per-switch counter fields
+_LS_RECEIVED = 0
+_LS_GAPS = 1
+_LS_JITTER16 = 2  # RFC 3550 style jitter estimate, in 1/16 ms
+_LS_MAX_INTERVAL = 3
+_LS_DECODE_ERRORS = 4
+_LS_LAST_MS = 5
+_LS_FIELDS = 6
+
+
+@micropython.native
+def _is_name_field(name, buf) -> bool:
+    # compare a switch name field with the one in a datagram, without slicing the datagram.
+    pos = SWITCH_NAME_POS
+    for i in range(SWITCH_NAME_SIZE):
+        if name[i] != buf[pos + i]:
+            return False
+    return True
+
+
+class LinkStats:
+    """
+    fixed-size table of link quality counters for up to `slots` switches, keyed by the raw switch name field.
+    the status datagrams carry no sequence number, so lost datagrams are inferred from arrival gaps
+    longer than 1.5 broadcast periods.  arrival times are taken when the receiver reads the socket, so intervals
+    and jitter include up to RECEIVE_POLL_MS of polling error.
+    """
+    __slots__ = ('_names', '_stats', '_period_ms', 'decode_errors')
+
+    def __init__(self, slots=4, period_ms=STATUS_BROADCAST_PERIOD_MS):
+        self._names = [None] * slots
+        self._stats = array('l', [0] * (slots * _LS_FIELDS))
+        self._period_ms = period_ms
+        self.decode_errors = 0  # datagrams that could not be attributed to a switch
+
+    def _slot(self, buf) -> int:
+        names = self._names
+        oldest = 0
+        oldest_ms = None
+        for i in range(len(names)):
+            name = names[i]
+            if name is None:
+                names[i] = bytes(buf[SWITCH_NAME_POS:])
+                return i
+            if _is_name_field(name, buf):
+                return i
+            last_ms = self._stats[i * _LS_FIELDS + _LS_LAST_MS]
+            if oldest_ms is None or ticks_diff(last_ms, oldest_ms) < 0:
+                oldest = i
+                oldest_ms = last_ms
+        # table is full, forget the switch heard from least recently.
+        names[oldest] = bytes(buf[SWITCH_NAME_POS:])
+        base = oldest * _LS_FIELDS
+        for i in range(_LS_FIELDS):
+            self._stats[base + i] = 0
+        return oldest
+
+    def arrival(self, buf, now_ms=None) -> int:
+        """
+        record arrival of a datagram in buf.
+        :return: the table slot of the sending switch.
+        """
+        if now_ms is None:
+            now_ms = milliseconds()
+        slot = self._slot(buf)
+        stats = self._stats
+        base = slot * _LS_FIELDS
+        last_ms = stats[base + _LS_LAST_MS]
+        stats[base + _LS_LAST_MS] = now_ms
+        stats[base + _LS_RECEIVED] += 1
+        if stats[base + _LS_RECEIVED] > 1:
+            period = self._period_ms
+            interval = ticks_diff(now_ms, last_ms)
+            if interval > stats[base + _LS_MAX_INTERVAL]:
+                stats[base + _LS_MAX_INTERVAL] = interval
+            if interval * 2 > period * 3:
+                stats[base + _LS_GAPS] += (interval + period // 2) // period - 1
+            deviation = interval - period
+            if deviation < 0:
+                deviation = -deviation
+            stats[base + _LS_JITTER16] += deviation - ((stats[base + _LS_JITTER16] + 8) >> 4)
+        return slot
+
+    def decode_error(self, slot=-1) -> None:
+        if slot < 0:
+            self.decode_errors += 1
+        else:
+            self._stats[slot * _LS_FIELDS + _LS_DECODE_ERRORS] += 1
+
+    def find(self, switch_name: str) -> int:
+        for i in range(len(self._names)):
+            name = self._names[i]
+            if name is not None and name.partition(b'\0')[0].decode() == switch_name:
+                return i
+        return -1
+
+    def get(self, slot: int) -> dict:
+        stats = self._stats
+        base = slot * _LS_FIELDS
+        return {'switch_name': self._names[slot].partition(b'\0')[0].decode(),
+                'received': stats[base + _LS_RECEIVED],
+                'gaps': stats[base + _LS_GAPS],
+                'jitter_ms': stats[base + _LS_JITTER16] >> 4,
+                'max_interval_ms': stats[base + _LS_MAX_INTERVAL],
+                'decode_errors': stats[base + _LS_DECODE_ERRORS],
+                'age_ms': ticks_diff(milliseconds(), stats[base + _LS_LAST_MS]),
+                }
+
+    def as_dict(self) -> dict:
+        return {'switches': [self.get(i) for i in range(len(self._names)) if self._names[i] is not None],
+                'decode_errors': self.decode_errors,
+                'period_ms': self._period_ms,
+                'poll_ms': RECEIVE_POLL_MS,  # resolution of the arrival times
+                }
+
+
 class ReceiveBroadcasts:
     """
     class that receives antenna control UDP messages from BandSelectors.
-    None of this is implemented yet.
+    datagrams from the inventory's switch update the inventory in place, then (message_id, inventory)
+    is enqueued.  datagrams from other switches are counted in link_stats and otherwise ignored.
+    if multicast_group is set, the socket is bound to all interfaces and joins the group on interface_ip.
+    the socket still receives subnet broadcasts, so if the group cannot be joined it falls back to broadcast.
     """
 
-    def __init__(self, receive_ip, receive_port, config:dict, message_queue: RingbufQueue, message_id: int):
+    def __init__(self, receive_ip, receive_port, config:dict, message_queue: RingbufQueue, message_id: int,
+                 inventory, multicast_group=None, interface_ip='0.0.0.0', link_stats: LinkStats = None):
         self.receive_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.receive_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.msgq = message_queue
         self.msgid = message_id
+        self.inventory = inventory
         self.buf = bytearray(STATUS_BROADCAST_SIZE)
+        self.link_stats = link_stats if link_stats is not None else LinkStats()
+        # micropython sockets have readinto(), cpython sockets have recv_into().
+        self._readinto = getattr(self.receive_socket, 'readinto', None) or self.receive_socket.recv_into
+        self.multicast = False
         self.run = True
         try:
-            sockaddr = socket.getaddrinfo(receive_ip, receive_port)[0][-1]
+            if multicast_group:
+                sockaddr = socket.getaddrinfo('0.0.0.0', receive_port)[0][-1]
+            else:
+                sockaddr = socket.getaddrinfo(receive_ip, receive_port)[0][-1]
             self.receive_socket.bind(sockaddr)
-            self.receive_socket.settimeout(0.001)
-            logging.info(f'Broadcast address is {receive_ip}:{receive_port}', 'udp_messages:ReceiveBroadcasts.init')
-            logging.info(f'Listening for status broadcasts', 'udp_messages:ReceiveBroadcasts.init')
+            self.receive_socket.settimeout(0)  # do not block the other tasks while polling
+            if multicast_group:
+                self.multicast = self.join_group(multicast_group, interface_ip)
+            if self.multicast:
+                logging.info('Multicast group is %s:%s', 'udp_messages:ReceiveBroadcasts.init',
+                             multicast_group, receive_port)
+            else:
+                logging.info('Broadcast address is %s:%s', 'udp_messages:ReceiveBroadcasts.init',
+                             receive_ip, receive_port)
+            logging.info('Listening for status broadcasts', 'udp_messages:ReceiveBroadcasts.init')
 
         except Exception as exc:
             logging.exception('problem setting up socket', 'udp_messages:ReceiveBroadcasts.init', exc_info=exc)
 
+    def join_group(self, multicast_group, interface_ip='0.0.0.0') -> bool:
+        if not is_multicast_address(multicast_group):
+            logging.warning('%s is not a multicast address, using broadcast',
+                            'udp_messages:ReceiveBroadcasts.join_group', multicast_group)
+            return False
+        try:
+            mreq = inet_aton(multicast_group) + inet_aton(interface_ip)
+            self.receive_socket.setsockopt(_IPPROTO_IP, _IP_ADD_MEMBERSHIP, mreq)
+            return True
+        except (OSError, ValueError) as exc:
+            logging.warning('cannot join multicast group %s: %s, falling back to broadcast',
+                            'udp_messages:ReceiveBroadcasts.join_group', multicast_group, exc)
+            return False
+
     async def wait_for_datagram(self):
+        link_stats = self.link_stats
+        inventory = self.inventory
+        msg = (self.msgid, inventory)
         while self.run:
+            slot = -1
             try:
-                bytes_in = self.receive_socket.readinto(self.buf)
-                #if logging.should_log(logging.DEBUG):
-                #    logging.debug(f'udp_data "{self.buf}"', 'udp_messages:ReceiveBroadcasts:wait_for_datagram')
-                stuff = unpack(STATUS_BROADCAST_FMT, self.buf)
-                data = []
-                for item in stuff:
-                    if isinstance(item, bytes):
-                        item = item.partition(b'\0')[0].decode()
-                    data.append(item)
-                if logging.should_log((logging.DEBUG)):
-                    logging.debug(f'message data "{data}"', 'udp_messages:ReceiveBroadcasts:wait_for_datagram')
-                msg = (self.msgid, data)
-                await self.msgq.put(msg)
+                bytes_in = self._readinto(self.buf)
+                if bytes_in is None:  # micropython's non-blocking readinto() when there is no datagram
+                    await sleep_ms(RECEIVE_POLL_MS)
+                    continue
+                # logging.debug('udp_data "%s"', 'udp_messages:ReceiveBroadcasts:wait_for_datagram', self.buf)
+                if bytes_in != STATUS_BROADCAST_SIZE:
+                    link_stats.decode_error()
+                    logging.warning('datagram is wrong length: %s, expected %d',
+                                    'udp_messages:ReceiveBroadcasts:wait_for_datagram', bytes_in, STATUS_BROADCAST_SIZE)
+                    await asyncio.sleep(0.1)
+                    continue
+                slot = link_stats.arrival(self.buf)
+                if inventory.update_from_buffer(self.buf):
+                    await self.msgq.put(msg)
+                elif logging.should_log(logging.WARNING):
+                    logging.warning('unexpected switch name %s, want switch_name %s',
+                                    'udp_messages:ReceiveBroadcasts:wait_for_datagram',
+                                    bytes(self.buf[SWITCH_NAME_POS:]), inventory.switch_name)
             except OSError as exc:
-                # this is a timeout exception, no data was received, this is not abnormal.
+                # no data was received (EAGAIN on cpython), this is not abnormal.
                 pass
             except Exception as exc:
+                link_stats.decode_error(slot)
                 logging.exception('problem receiving datagram',
                                   'udp_messages:ReceiveBroadcasts.:wait_for_datagram', exc_info=exc)
-            await asyncio.sleep(0.1)
+            await sleep_ms(RECEIVE_POLL_MS)
 
 
     def stop(self):
@@ -22,7 +22,7 @@ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
 OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
 OF THE POSSIBILITY OF SUCH DAMAGE.
 """
-__version__ = '0.9.4'  # 2025-12-29
+__version__ = '0.9.7'  # 2026-10-19
 
 import sys
 import time
@@ -31,8 +31,28 @@ BITS = bytes([0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4])
 
 upython = sys.implementation.name == 'micropython'
 if upython:
+    from asyncio import sleep_ms, ThreadSafeFlag
     import micropython
 else:
+    import asyncio
+
+    async def sleep_ms(ms):  # micropython asyncio.sleep_ms() in cpython
+        await asyncio.sleep(ms / 1000)
+
+    class ThreadSafeFlag:  # micropython asyncio.ThreadSafeFlag in cpython, set() must be called from the loop
+        def __init__(self):
+            self._event = asyncio.Event()
+
+        def set(self):
+            self._event.set()
+
+        def clear(self):
+            self._event.clear()
+
+        async def wait(self):
+            await self._event.wait()
+            self._event.clear()
+
     # provide no-op native and viper decorators
     class _MP:
         @staticmethod
@@ -61,6 +81,15 @@ def milliseconds():
     return time.ticks_ms() if upython else int(time.time() * 1000)
 
 
+def microseconds():
+    return time.ticks_us() if upython else time.perf_counter_ns() // 1000
+
+
+def ticks_diff(end, start):
+    # micropython ticks wrap, use this to subtract microseconds() values.
+    return time.ticks_diff(end, start) if upython else end - start
+
+
 @micropython.native
 def safe_int(value, default:int=-1) -> int:
     if value is None:
@@ -0,0 +1,160 @@
+#
+# replay.py -- replays a message queue recording into the band selector's msg_loop, on CPython.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+"""
+replays a recording made with /api/recorder (data/messages.rec on the Pico-W) into main.msg_loop, using
+not_machine pins and a stand-in antenna switch that accepts every select_antenna request.  reports message
+handler timings, queue counters, band change traces and the resulting pin states as JSON.
+
+only the external inputs are replayed.  band changes and power sense are replayed by setting the simulated
+input pins, so the input scanner sees them just as it would on the hardware; buttons, network up/down and
+switch status broadcasts are put on the message queue.  messages the controller makes itself (LCD updates,
+select_antenna responses, timeouts) are made again by the code under test.
+
+usage: python replay.py messages.rec [--max-speed] [--radio-number 1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'band_selector'))
+
+from message_recorder import read_records, KIND_INVENTORY  # noqa: E402
+from not_machine import machine  # noqa: E402
+from udp_messages import SWITCH_NAME_POS  # noqa: E402
+
+_BAND_PINS = (17, 18, 19, 20)  # BAND0 (LSB) to BAND3 GPIO pins
+_POWER_SENSE_PIN = 22
+_PIN_POLL_WAIT = 0.06  # seconds, a bit longer than the input scanner's longest debounce, 50 ms for power sense
+
+
+def set_pins(pins, value):
+    for pin in pins:
+        machine.Pin(pin).value(value & 1)
+        value >>= 1
+
+
+async def stand_in_switch(reader, writer):
+    """
+    a minimal antenna switch web server, it says ok to everything.
+    """
+    await reader.readline()
+    while (await reader.readline()) not in (b'\r\n', b''):
+        pass
+    writer.write(b'HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 4\r\n\r\nok\r\n')
+    await writer.drain()
+    writer.close()
+
+
+async def replay(filename, max_speed, radio_number):
+    import main  # main starts its input scanner task when imported, so it must be imported in a running loop.
+
+    server = await asyncio.start_server(stand_in_switch, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    main.switch_host = b'127.0.0.1:%d' % port
+    main.state.update(radio_number=radio_number)
+    queued = {main._MSG_BTN_1, main._MSG_BTN_2, main._MSG_BTN_3, main._MSG_BTN_4, main._MSG_NETWORK_UPDOWN,
+              main._MSG_UDP_RESPONSE}
+    pins = {main._MSG_BAND_CHANGE: _BAND_PINS,
+            main._MSG_POWER_SENSE: (_POWER_SENSE_PIN,)}
+    msg_loop_task = asyncio.create_task(main.msg_loop(main.msgq))
+    await asyncio.sleep(0.2)  # let the input scanner send its startup messages
+
+    records = 0
+    skipped = 0
+    t0 = time.monotonic()
+    for t_ms, msg_id, kind, payload, trace_id in read_records(filename):
+        if msg_id not in queued and msg_id not in pins:
+            skipped += 1
+            continue
+        if max_speed:
+            while not main.msgq.empty():
+                await asyncio.sleep(0)
+        else:
+            delay = t_ms / 1000 - (time.monotonic() - t0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if msg_id in pins:
+            set_pins(pins[msg_id], payload)
+            if max_speed:
+                await asyncio.sleep(_PIN_POLL_WAIT)  # wait for the scanner to accept it
+            records += 1
+            continue
+        if kind == KIND_INVENTORY:
+            main.inventory.set_switch_name(payload[SWITCH_NAME_POS:].partition(b'\0')[0].decode())
+            if not main.inventory.update_from_buffer(payload):
+                skipped += 1
+                continue
+            payload = main.inventory
+        await main.msgq.put((msg_id, payload))
+        records += 1
+
+    while not main.msgq.empty():
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.1 if max_speed else 1.0)  # let the last select_antenna calls finish
+    elapsed = time.monotonic() - t0
+    msg_loop_task.cancel()
+    server.close()
+
+    return {'recording': filename,
+            'replayed': records,
+            'skipped': skipped,
+            'elapsed_s': round(elapsed, 3),
+            'messages': main.dispatcher.stats(),
+            'queue': main.msgq.stats(),
+            'traces': main.band_traces.as_list(),
+            'antenna_confirmation': main.confirm_latency.as_dict(),
+            'state': main.state.as_dict(),
+            'pins': {'inhibit': main.inhibit_pin.value(),
+                     'red_led': main.red_led.value(),
+                     'power_on': main.poweron_pin.value(),
+                     },
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='replay',
+        description='Replay a band selector message recording')
+    parser.add_argument('filename',
+                        help='recording file, copied from data/messages.rec')
+    parser.add_argument('--max-speed',
+                        action='store_true',
+                        help='replay as fast as possible, not in real time')
+    parser.add_argument('--radio-number',
+                        type=int,
+                        default=1,
+                        help='radio number, 1 or 2')
+    args = parser.parse_args()
+    report = asyncio.run(replay(args.filename, args.max_speed, args.radio_number))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#
+# test_udp_messages.py -- round trips status datagrams through udp_messages on the loopback interface, on CPython.
+#
+__author__ = 'J. B. Otterson'
+__copyright__ = """
+Copyright 2026, J. B. Otterson N1KDO.
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+  1. Redistributions of source code must retain the above copyright notice,
+     this list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+__version__ = '0.0.2'  # 2026-10-19
+
+"""
+the receiver joins a multicast group on 127.0.0.1, and status datagrams are sent to it two ways: to the group,
+through the group membership, and to fallback_ip, when the sender cannot set up multicast.
+
+usage: python -m pytest src/tests  or  python -m unittest discover src/tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'band_selector'))
+
+import udp_messages  # noqa: E402
+from antenna_inventory import AntennaInventory  # noqa: E402
+from ringbuf_queue import RingbufQueue  # noqa: E402
+
+_MULTICAST_GROUP = '239.255.73.1'
+_LOOPBACK = '127.0.0.1'
+_MSG_UDP_RESPONSE = 42
+_BAD_TTL = 256  # the TTL is 8 bits, so the OS rejects this one
+
+_CONFIG = {'radio_names': [b'K3', b'K4'],
+           'antenna_names': [b'ant%d' % i for i in range(1, 9)],
+           'antenna_bands': [1, 2, 4, 8, 16, 32, 64, -1],
+           'hostname': b'test-switch',
+           }
+
+
+class TestStatusRoundTrip(unittest.TestCase):
+
+    def test_multicast(self):
+        """
+        sent to the group, the datagram can only arrive through the receiver's group membership.
+        """
+        asyncio.run(self._round_trip(_MULTICAST_GROUP))
+
+    def test_multicast_fallback(self):
+        """
+        the sender cannot set the multicast TTL, so it sends to fallback_ip instead, which the receiver's
+        socket still gets.
+        """
+        asyncio.run(self._round_trip(_LOOPBACK, multicast_ttl=_BAD_TTL, fallback_ip=_LOOPBACK))
+
+    async def _round_trip(self, expected_ip, **sender_args):
+        msgq = RingbufQueue(4)
+        inventory = AntennaInventory('test-switch')
+        receiver = udp_messages.ReceiveBroadcasts(_LOOPBACK, 0, {}, msgq, _MSG_UDP_RESPONSE, inventory,
+                                                  multicast_group=_MULTICAST_GROUP, interface_ip=_LOOPBACK)
+        self.assertTrue(receiver.multicast, 'could not join the multicast group on the loopback interface')
+        port = receiver.receive_socket.getsockname()[1]
+        sender = udp_messages.SendBroadcasts(_MULTICAST_GROUP, port, _CONFIG, [3, 5], interface_ip=_LOOPBACK,
+                                             **sender_args)
+        self.assertEqual(sender.sockaddr, (expected_ip, port))
+
+        receiver_task = asyncio.create_task(receiver.wait_for_datagram())
+        sender_task = asyncio.create_task(sender.send_datagrams())
+        try:
+            msg = await asyncio.wait_for(msgq.get(), 5)
+        finally:
+            sender.stop()
+            receiver.stop()
+            await asyncio.gather(sender_task, receiver_task)
+            sender.socket.close()
+            receiver.receive_socket.close()
+
+        self.assertEqual(msg, (_MSG_UDP_RESPONSE, inventory))
+        self.assertEqual(inventory.radio_1_antenna, 3)
+        self.assertEqual(inventory.radio_2_antenna, 5)
+        self.assertEqual(inventory.radio_names, ('K3', 'K4'))
+        self.assertEqual(inventory.antenna_names[7], 'ant8')
+        self.assertEqual(inventory.antenna_bands[7], 0xffff)
+        stats = receiver.link_stats.get(receiver.link_stats.find('test-switch'))
+        self.assertEqual(stats['decode_errors'], 0)
+        self.assertGreaterEqual(stats['received'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()